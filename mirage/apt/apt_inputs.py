@@ -1466,6 +1466,8 @@ def ra_dec_update(exposure_dict, siaf_instances, verbose=False):
             #        about the link between the grismts apertures and the intermediates and uses the intermediate in the Siaf instance. Also, there are
             #        currently no intermediate apertures in pysiaf for the F277W, F356W filters. What happens (in APT/reality) in those cases?
         else:
+            reference_v2 = aperture.V2Ref
+            reference_v3 = aperture.V3Ref
             if aperture_name in NIRCAM_SW_GRISMTS_APERTURES:
                 # Special case. When looking at grism time series observation
                 # we force the pointing to be at the reference location of the
@@ -1476,12 +1478,14 @@ def ra_dec_update(exposure_dict, siaf_instances, verbose=False):
                 # for the SW detectors, where this is no grism.
 
                 # Generate an attitude matrix from this and
-                # use to get the RA, Dec in the SW apertures
+                # use to get the RA, Dec in the SW apertures. The SIAF
+                # instances may be shared, so the aperture itself is
+                # left unchanged.
                 lw_gts = siaf_instances[siaf_instrument][lw_intermediate_aperture]
                 pointing_v2 = lw_gts.V2Ref
                 pointing_v3 = lw_gts.V3Ref
-                aperture.V2Ref = pointing_v2
-                aperture.V3Ref = pointing_v3
+                reference_v2 = pointing_v2
+                reference_v3 = pointing_v3
 
             local_roll, attitude_matrix, fullframesize, subarray_boundaries = \
                 siaf_interface.get_siaf_information(siaf_instances[siaf_instrument], aperture_name,
@@ -1490,7 +1494,7 @@ def ra_dec_update(exposure_dict, siaf_instances, verbose=False):
 
             # Calculate RA, Dec of reference location for the detector
             # Add in any offsets from the pointing file in the BaseX, BaseY columns
-            ra, dec = rotations.pointing(attitude_matrix, aperture.V2Ref, aperture.V3Ref)
+            ra, dec = rotations.pointing(attitude_matrix, reference_v2, reference_v3)
 
         aperture_ra.append(ra)
         aperture_dec.append(dec)
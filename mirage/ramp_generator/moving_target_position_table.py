@@ -40,10 +40,9 @@ ColDefs(
 
 """
 from astropy.time import Time, TimeDelta
-from datetime import datetime
 import numpy as np
 
-from mirage.seed_image.ephemeris_tools import to_timestamp
+from mirage.seed_image.ephemeris_tools import obstime_to_datetime, to_timestamp
 
 
 def create_mt_pos_entry(time_string, movtarg_x, movtarg_y, refpix_ra, refpix_dec,
@@ -265,31 +264,3 @@ def populate_moving_target_table(grouptable, ephem_interp_func, movtarg_x, movta
     # Now remove the top garbage row from the table
     mt_position = mt_position[1:]
     return mt_position
-
-
-def obstime_to_datetime(obstime):
-    """Convert the observation time (from the datamodel instance) into a
-    datetime (which can be used by the ephemeris interpolation function)
-
-    Parameters
-    ----------
-    obstime : float
-        Observation time in MJD. If populating the MT_RA, MT_DEC keywords,
-        this will be the mid-time of the exposure.
-
-    Returns
-    -------
-    time_datetime : datetime.datetime
-        Datetime associated with ```obstime```
-    """
-    mid_time_astropy = Time(obstime, format='mjd')
-    isot = mid_time_astropy.isot
-    date_val, time_val = isot.split('T')
-    time_val_parts = time_val.split(':')
-    fullsec = float(time_val.split(':')[2])
-    microsec = '{}'.format(int((fullsec - int(fullsec)) * 1e6))
-    new_time_val = '{}:{}:{}:{}'.format(time_val_parts[0], time_val_parts[1], int(fullsec), microsec)
-    time_datetime = datetime.strptime("{} {}".format(date_val, new_time_val), "%Y-%m-%d %H:%M:%S:%f")
-    return time_datetime
-
-
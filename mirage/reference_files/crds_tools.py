@@ -29,8 +29,11 @@ Use
 """
 
 import datetime
+import hashlib
+import json
 import os
 import logging
+import threading
 
 from mirage.logging import logging_functions
 from mirage.utils.utils import ensure_dir_exists
@@ -40,6 +43,9 @@ classdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
 log_config_file = os.path.join(classdir, 'logging', LOG_CONFIG_FILENAME)
 logging_functions.create_logger(log_config_file, STANDARD_LOGFILE_NAME)
 
+REFFILE_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'mirage', 'crds_reffiles.json')
+REFFILE_CACHE_LOCK = threading.Lock()
+
 
 def env_variables():
     """Check the values of the CRDS-related environment variables
@@ -201,3 +207,114 @@ def get_reffiles(parameter_dict, reffile_types, download=True):
             reffile_mapping[key] = os.path.join(crds_path, 'references/jwst', instrument, value)
 
     return reffile_mapping
+
+
+def get_reffiles_cached(parameter_dict, reffile_types, download=True, cache_file=REFFILE_CACHE_FILE):
+    """Wrapper around ``get_reffiles`` that keeps the results in a JSON
+    file, so that CRDS is queried only once for a given set of parameters,
+    reference file types, CRDS server, CRDS_PATH and resolved context. If
+    the context cannot be determined, CRDS is queried directly. TIME-OBS is not included
+    in the cache key, so results are re-used for all observations on the
+    same date. If ``download`` is True, cached results are only used if all
+    of the listed files are present.
+
+    Parameters
+    ----------
+    parameter_dict : dict
+        Dictionary of basic metadata from the file to be processed by the
+        returned reference files (e.g. INSTRUME, DETECTOR, etc)
+
+    reffile_types : list
+        List of reference file types to look up and download
+
+    download : bool
+        Passed to ``get_reffiles``
+
+    cache_file : str
+        Name of the JSON file in which results are saved
+
+    Returns
+    -------
+    reffile_mapping : dict
+        Mapping of reference file type to reference file name
+    """
+    # Results depend on the CRDS context actually in use. If it cannot be
+    # determined, query CRDS directly rather than risk re-using stale results.
+    context = _resolved_crds_context()
+    if context is None:
+        return get_reffiles(parameter_dict, reffile_types, download=download)
+
+    # Paths returned without downloading are under CRDS_PATH, so it is part of the key
+    key_params = {key: value for key, value in parameter_dict.items() if key != 'TIME-OBS'}
+    key_data = repr((sorted(key_params.items()), sorted(reffile_types), download,
+                     os.environ.get('CRDS_SERVER_URL', ''), os.environ.get('CRDS_PATH', ''), context))
+    key = hashlib.sha1(key_data.encode()).hexdigest()
+
+    with REFFILE_CACHE_LOCK:
+        reffile_mapping = _read_reffile_cache(cache_file).get(key)
+    if reffile_mapping is not None:
+        if not download or all(os.path.isfile(filename) for filename in reffile_mapping.values()):
+            return reffile_mapping
+
+    reffile_mapping = get_reffiles(parameter_dict, reffile_types, download=download)
+
+    # The lock allows several queries to be run in separate threads. Re-read the
+    # cache before updating it, to keep entries added by other threads. Write
+    # to a temporary file and then rename, so that the cache file is never left
+    # partially written.
+    with REFFILE_CACHE_LOCK:
+        cache = _read_reffile_cache(cache_file)
+        cache[key] = reffile_mapping
+        ensure_dir_exists(os.path.dirname(cache_file))
+        tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+        with open(tmp_file, 'w') as file_obj:
+            json.dump(cache, file_obj)
+        os.replace(tmp_file, cache_file)
+    return reffile_mapping
+
+
+def _resolved_crds_context():
+    """Find the name of the CRDS context (e.g. jwst_1100.pmap) that queries
+    will use. This is the context set by CRDS_CONTEXT if present, and the
+    server's current default otherwise.
+
+    Returns
+    -------
+    context : str or None
+        Name of the context. None if it cannot be determined.
+    """
+    # IMPORTANT: Import of crds package must be done AFTER the environment
+    # variables are set in the functions above
+    import crds
+
+    try:
+        return crds.get_default_context('jwst')
+    except Exception:
+        logger = logging.getLogger('mirage.reference_files.crds_tools._resolved_crds_context')
+        logger.warning('Unable to determine the CRDS context. Not using the CRDS reference file cache.')
+        return None
+
+
+def _read_reffile_cache(cache_file):
+    """Read the JSON file of cached CRDS query results
+
+    Parameters
+    ----------
+    cache_file : str
+        Name of the JSON file
+
+    Returns
+    -------
+    cache : dict
+        Cached query results. Empty if the file does not exist or
+        cannot be read.
+    """
+    if not os.path.isfile(cache_file):
+        return {}
+    try:
+        with open(cache_file) as file_obj:
+            return json.load(file_obj)
+    except (OSError, ValueError):
+        logger = logging.getLogger('mirage.reference_files.crds_tools._read_reffile_cache')
+        logger.warning('Unable to read CRDS reference file cache {}. Ignoring.'.format(cache_file))
+        return {}
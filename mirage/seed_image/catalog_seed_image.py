@@ -9,6 +9,7 @@ cosmic rays.
 
 import argparse
 import datetime
+import functools
 import sys
 import glob
 import logging
@@ -23,7 +24,6 @@ import math
 import yaml
 import time
 import pkg_resources
-import asdf
 import scipy.signal as s1
 import scipy.special as sp
 from scipy.ndimage import rotate
@@ -75,16 +75,99 @@ inst_abbrev = {'nircam': 'NRC',
                'niriss': 'NIS',
                'fgs': 'FGS'}
 
-ALLOWEDOUTPUTFORMATS = ['DMS']
+ALLOWEDOUTPUTFORMATS = frozenset({'DMS'})
 WFE_OPTIONS = ['predicted', 'requirements']
 WFEGROUP_OPTIONS = np.arange(5)
 
-
 classdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
 log_config_file = os.path.join(classdir, 'logging', LOG_CONFIG_FILENAME)
 logging_functions.create_logger(log_config_file, STANDARD_LOGFILE_NAME)
 
 
+@functools.lru_cache(maxsize=32)
+def _intermediate_aperture_attitude(v2_ref, v3_ref, ra, dec, telescope_roll):
+    """Calculate the local roll and attitude matrix for a pointing at the
+    given V2, V3 reference location, in the same way as
+    ``siaf_interface.get_siaf_information``. Results are cached, so that
+    repeated Catalog_seed instances pointed at the same intermediate
+    aperture do not rebuild the attitude matrix. The returned attitude
+    matrix is shared between callers and is read-only.
+
+    Parameters
+    ----------
+    v2_ref : float
+        V2 value, in arcseconds, of the aperture reference location
+
+    v3_ref : float
+        V3 value, in arcseconds, of the aperture reference location
+
+    ra : float
+        RA value of the pointing, in degrees
+
+    dec : float
+        Dec value of the pointing, in degrees
+
+    telescope_roll : float
+        PA_V3, position angle of the telescope, in degrees
+
+    Returns
+    -------
+    local_roll : float
+        Local roll angle at the reference location of the aperture
+
+    attitude_matrix : numpy.ndarray
+        Attitude matrix relating RA, Dec, local roll angle to V2, V3
+    """
+    local_roll = set_telescope_pointing.compute_local_roll(telescope_roll, ra, dec, v2_ref, v3_ref)
+    attitude_matrix = rotations.attitude(v2_ref, v3_ref, ra, dec, local_roll)
+    attitude_matrix.flags.writeable = False
+    return local_roll, attitude_matrix
+
+
+@functools.lru_cache(maxsize=8)
+def _load_readpatterns(path):
+    """Read in the readout pattern definition file, with the pattern
+    names converted to upper case. Results are cached by filename, so
+    that the file is parsed only once per process.
+
+    Parameters
+    ----------
+    path : str
+        Name of the readout pattern definition file
+
+    Returns
+    -------
+    readpatterns : astropy.table.Table
+        Table of readout pattern definitions
+    """
+    readpatterns = ascii.read(path)
+    readpatterns['name'] = np.char.upper(np.asarray(readpatterns['name']))
+    return readpatterns
+
+
+@functools.lru_cache(maxsize=8)
+def _readpattern_lookup(path):
+    """Build a dictionary mapping readout pattern name to the
+    corresponding (nframe, nskip) values, from the readout pattern
+    definition file.
+
+    Parameters
+    ----------
+    path : str
+        Name of the readout pattern definition file
+
+    Returns
+    -------
+    lookup : dict
+        Keys are upper case readout pattern names. Values are (nframe, nskip)
+        tuples
+    """
+    readpatterns = _load_readpatterns(path)
+    return {name: (nframe, nskip) for name, nframe, nskip in zip(readpatterns['name'],
+                                                                  readpatterns['nframe'],
+                                                                  readpatterns['nskip'])}
+
+
 class Catalog_seed():
     def __init__(self, offline=False):
         """Instantiate the Catalog_seed class
@@ -1436,7 +1519,7 @@ class Catalog_seed():
             start_date = datetime.datetime.strptime(ob_time, '%Y-%m-%dT%H:%M:%S')
         except ValueError:
             start_date = datetime.datetime.strptime(ob_time, '%Y-%m-%dT%H:%M:%S.%f')
-        all_times = [ephemeris_tools.to_timestamp(start_date + datetime.timedelta(seconds=elem)) for elem in frameexptimes]
+        all_times = ephemeris_tools.to_timestamp(start_date) + frameexptimes
 
         # If the ephemeris_file column is not present, add it and populate it with
         # 'none' for all entries. This will make for fewer possibilities when looping
@@ -1495,11 +1578,11 @@ class Catalog_seed():
             if entry['ephemeris_file'].lower() != 'none':
                 self.logger.info(("Using ephemeris file {} to find the location of source #{} in {}."
                                   .format(entry['ephemeris_file'], index, filename)))
-                ra_eph, dec_eph = ephemeris_tools.get_ephemeris(entry['ephemeris_file'])
+                radec_eph = ephemeris_tools.get_ephemeris(entry['ephemeris_file'])
+                ra_eph, dec_eph = radec_eph
 
                 # Create list of positions for all frames
-                ra_frames = ra_eph(all_times)
-                dec_frames = dec_eph(all_times)
+                ra_frames, dec_frames = radec_eph(all_times)
 
                 # Calculate the source locations at sub-frametimes, based on the requested spatial frequency
                 ra_frames_nested, dec_frames_nested, subframe_times_nested =  ephemeris_tools.calculate_nested_positions(ra_frames, dec_frames, all_times,
@@ -1597,8 +1680,8 @@ class Catalog_seed():
 
                     # Now that the background source's positions are guaranteed to be in
                     # units of RA, Dec, add the non-sidereal offsets
-                    ra_frames -= delta_non_sidereal_ra
-                    dec_frames -= delta_non_sidereal_dec
+                    ra_frames = ra_frames - delta_non_sidereal_ra
+                    dec_frames = dec_frames - delta_non_sidereal_dec
 
                     # Calculate the source locations at sub-frametimes, based on the requested spatial frequency
                     ra_frames_nested, dec_frames_nested, subframe_times_nested =  ephemeris_tools.calculate_nested_positions(ra_frames, dec_frames, all_times,
@@ -2313,15 +2396,17 @@ class Catalog_seed():
 
         self.logger.info(('Calculating target RA, Dec at the observation time using ephemeris file: {}'
                           .format(src_catalog['ephemeris_file'][0])))
-        ra_eph, dec_eph = ephemeris_tools.get_ephemeris(src_catalog['ephemeris_file'][0])
+        radec_eph = ephemeris_tools.get_ephemeris(src_catalog['ephemeris_file'][0])
+        ra_eph, dec_eph = radec_eph
+        ra_start, dec_start = radec_eph(start_date)
 
         # If the input x_or_RA and y_or_Dec columns have values of 'none', then
         # populating them with the values calculated here results in truncated
         # values being used. So let's remove the old columns and re-add them
         src_catalog.remove_column('x_or_RA')
         src_catalog.remove_column('y_or_Dec')
-        src_catalog.add_column(ra_eph(start_date), name='x_or_RA', index=1)
-        src_catalog.add_column(dec_eph(start_date), name='y_or_Dec', index=2)
+        src_catalog.add_column(ra_start, name='x_or_RA', index=1)
+        src_catalog.add_column(dec_start, name='y_or_Dec', index=2)
         return src_catalog, ra_eph, dec_eph
 
     def create_sidereal_image(self):
@@ -5397,7 +5482,7 @@ class Catalog_seed():
         if self.params['Output']['format'] not in ALLOWEDOUTPUTFORMATS:
             raise ValueError(("WARNING: unsupported output format {} requested. "
                               "Possible options are {}.".format(self.params['Output']['format'],
-                                                                ALLOWEDOUTPUTFORMATS)))
+                                                                sorted(ALLOWEDOUTPUTFORMATS))))
 
         # Entries for creating the grism input image
         if not isinstance(self.params['Output']['grism_source_image'], bool):
@@ -5410,7 +5495,7 @@ class Catalog_seed():
         try:
             self.params['simSignals']['extendedCenter'] = np.fromstring(self.params['simSignals']['extendedCenter'],
                                                                         dtype=int, sep=", ")
-        except:
+        except (ValueError, TypeError):
             raise RuntimeError(("WARNING: not able to parse the extendedCenter list {}. "
                                 "It should be a comma-separated list of x and y pixel positions."
                                 .format(self.params['simSignals']['extendedCenter'])))
@@ -5433,15 +5518,14 @@ class Catalog_seed():
 
         # Read in readout pattern definition file
         # and make sure the possible readout patterns are in upper case
-        self.readpatterns = ascii.read(self.params['Reffiles']['readpattdefs'])
-        self.readpatterns['name'] = [s.upper() for s in self.readpatterns['name']]
+        self.readpatterns = _load_readpatterns(self.params['Reffiles']['readpattdefs'])
+        self._readpatt_lut = _readpattern_lookup(self.params['Reffiles']['readpattdefs'])
 
         # If the requested readout pattern is in the table of options,
         # then adopt the appropriate nframe and nskip
-        if self.params['Readout']['readpatt'] in self.readpatterns['name']:
-            mtch = self.params['Readout']['readpatt'] == self.readpatterns['name']
-            self.params['Readout']['nframe'] = self.readpatterns['nframe'][mtch].data[0]
-            self.params['Readout']['nskip'] = self.readpatterns['nskip'][mtch].data[0]
+        vals = self._readpatt_lut.get(self.params['Readout']['readpatt'])
+        if vals is not None:
+            self.params['Readout']['nframe'], self.params['Readout']['nskip'] = vals
             self.logger.info(('Requested readout pattern {} is valid. '
                               'Using the nframe = {} and nskip = {}'
                               .format(self.params['Readout']['readpatt'],
@@ -5530,9 +5614,9 @@ class Catalog_seed():
         on the filter and pupil value of the observation.
         """
         photom_data = fits.getdata(self.params['Reffiles']['photom'])
-        photom_filters = np.array([elem['filter'] for elem in photom_data])
-        photom_pupils = np.array([elem['pupil'] for elem in photom_data])
-        photom_values = np.array([elem['photmjsr'] for elem in photom_data])
+        photom_filters = np.char.upper(np.asarray(photom_data['filter'], dtype=str))
+        photom_pupils = np.char.upper(np.asarray(photom_data['pupil'], dtype=str))
+        photom_values = np.asarray(photom_data['photmjsr'])
 
         good = np.where((photom_filters == self.params['Readout']['filter'].upper()) & (photom_pupils == self.params['Readout']['pupil'].upper()))[0]
         if len(good) > 1:
@@ -5543,6 +5627,13 @@ class Catalog_seed():
         surf_bright_fluxcal = photom_values[good[0]]
         return surf_bright_fluxcal
 
+    @functools.cached_property
+    def surface_brightness_fluxcal(self):
+        """MJy/sr to ADU/sec conversion factor from the photom reference
+        file. The reference file is read only on first access.
+        """
+        return self.get_surface_brightness_fluxcal()
+
     def set_segmentation_threshold(self):
         """Determine the threshold value to use when determining which pixels
         to include in the segmentation map. Final units for the threshold
@@ -5564,14 +5655,13 @@ class Catalog_seed():
 
         if segmentation_threshold_units not in SUPPORTED_SEGMENTATION_THRESHOLD_UNITS:
             raise ValueError(('Unsupported unit for the segmentation map lower signal limit: {}.\n'
-                              'Supported units are: {}'.format(segmentation_threshold_units, SUPPORTED_SEGMENTATION_THRESHOLD_UNITS)))
+                              'Supported units are: {}'.format(segmentation_threshold_units, sorted(SUPPORTED_SEGMENTATION_THRESHOLD_UNITS))))
         if segmentation_threshold_units in ['adu/s', 'adu/sec']:
             pass
-        elif segmentation_threshold_units == ['e/s', 'e/sec']:
+        elif segmentation_threshold_units in ['e/s', 'e/sec']:
             self.segmentation_threshold /= self.gain_value
-        elif segmentation_threshold_units == ['mjy/sr', 'mjy/str']:
-            surface_brightness_fluxcal = self.get_surface_brightness_fluxcal()
-            self.segmentation_threshold /= surface_brightness_fluxcal
+        elif segmentation_threshold_units in ['mjy/sr', 'mjy/str']:
+            self.segmentation_threshold /= self.surface_brightness_fluxcal
         elif segmentation_threshold_units in ['erg/cm2/a']:
             self.segmentation_threshold /= self.photflam
         elif segmentation_threshold_units in ['erg/cm2/hz']:
@@ -5595,7 +5685,7 @@ class Catalog_seed():
         # make sure the input value is a float and between min and max
         try:
             value = float(value)
-        except:
+        except (ValueError, TypeError):
             raise ValueError("WARNING: {} for {} is not a float.".format(value, typ))
 
         if ((value >= vmin) & (value <= vmax)):
@@ -5653,12 +5743,11 @@ class Catalog_seed():
                 raise exc
 
         if self.use_intermediate_aperture:
-            self.intermediate_siaf = siaf_info[self.params['Readout']['intermediate_aperture']]
-            self.intermediate_local_roll, self.intermediate_attitude_matrix, _, \
-            _ = siaf_interface.get_siaf_information(siaf_info,
-                                                    self.params['Readout']['intermediate_aperture'],
-                                                    self.ra, self.dec,
-                                                    self.params['Telescope']['rotation'])
+            aperture_name = self.params['Readout']['intermediate_aperture']
+            self.intermediate_siaf = siaf_info[aperture_name]
+            self.intermediate_local_roll, self.intermediate_attitude_matrix = \
+                _intermediate_aperture_attitude(self.intermediate_siaf.V2Ref, self.intermediate_siaf.V3Ref,
+                                                self.ra, self.dec, self.params['Telescope']['rotation'])
 
     def read_distortion_reffile(self):
         """Read in the CRDS-format distortion reference file and save
@@ -5666,6 +5755,7 @@ class Catalog_seed():
         """
         coord_transform = None
         if self.runStep['astrometric']:
+            import asdf
             with asdf.open(self.params['Reffiles']['astrometric']) as dist_file:
                 coord_transform = dist_file.tree['model']
         # else:
@@ -5684,9 +5774,8 @@ class Catalog_seed():
         # if a keyword dictionary is provided, put the
         # keywords into the 0th and 1st extension headers
         if key_dict is not None:
-            for key in key_dict:
-                h0.header[key] = key_dict[key]
-                h1.header[key] = key_dict[key]
+            h0.header.update(key_dict)
+            h1.header.update(key_dict)
 
         if image2 is None:
             hdulist = fits.HDUList([h0, h1])
@@ -5,14 +5,23 @@ This module contains functions that work with JPL Horizons ephemeris files
 """
 
 
-from astropy.coordinates import SkyCoord
-from astropy.table import Table
 from astropy.time import Time
-import calendar
 from datetime import datetime, timezone
+import functools
 import numpy as np
+import os
 import pysiaf
-from scipy.interpolate import interp1d
+import re
+from scipy.interpolate import make_interp_spline
+
+
+# Data rows in a Horizons ephemeris file begin with: date, time, RA (h m s), Dec (d m s)
+# e.g. " 2020-Sep-08 00:00     01 49 28.77 +06 43 43.8  -1.971 ..."
+EPHEMERIS_ROW = re.compile(r'^\s*(\d{4}-[A-Za-z]{3}-\d{2})\s+(\d{2}:\d{2})\s+'
+                           r'(\d{1,2})\s+(\d{1,2})\s+(\d+(?:\.\d*)?)\s+'
+                           r'([+-]?)(\d{1,2})\s+(\d{1,2})\s+(\d+(?:\.\d*)?)(?:\s|$)')
+MONTH_NUMBERS = {'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04', 'may': '05', 'jun': '06',
+                 'jul': '07', 'aug': '08', 'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'}
 
 
 def calculate_nested_positions(x_or_ra_frames, y_or_dec_frames, times_list, spatial_frequency,
@@ -38,11 +47,11 @@ def calculate_nested_positions(x_or_ra_frames, y_or_dec_frames, times_list, spat
         Number of pixels or arcseconds between sub-frame images. Historically, this has been 0.3 pixels. The
         output subframe positions and times will be calculated at this spatial frequency.
 
-    ra_ephemeris : scipy.interpolate.interp1d
+    ra_ephemeris : function
         Interpolation function describing the RA portion of the ephemeris of the source.i.e. output from
         create_interpol_function().
 
-    dec_ephemeris : scipy.interpolate.interp1d
+    dec_ephemeris : function
         Interpolation function describing the Dec portion of the ephemeris of the source. i.e. output from
         create_interpol_function().
 
@@ -67,90 +76,228 @@ def calculate_nested_positions(x_or_ra_frames, y_or_dec_frames, times_list, spat
         Nested list of floats giving the times associated with all elements of ``ra_frames_nested`` and
         ``dec_frames_nested``
     """
-    subframe_times_nested = []
-    ra_frames_nested = []
-    dec_frames_nested = []
-
-    # Create an interpolation function using the frame locations for the case where ephemeris functions
-    # are not provided
-    if ra_ephemeris is None:
-        ra_interpol = interp1d(times_list, x_or_ra_frames)
-        dec_interpol = interp1d(times_list, y_or_dec_frames)
-
-    # Here we are looping over all frames in the entire exposure.
-    for i, (ra_frame, dec_frame, frame_time) in enumerate(zip(x_or_ra_frames[1:], y_or_dec_frames[1:], times_list[1:])):
-        # Note that within this loop, i starts at 0, but is pointing to the first (not zeroth)
-        # elements of ra_frames, dec_frames, all_times.
-
-        if position_units == 'angular':
-            # If inputs are in RA, Dec (which are in degrees), translate to arcseconds
-            delta_ra = (ra_frame - x_or_ra_frames[i]) * 3600.
-            delta_dec = (dec_frame - y_or_dec_frames[i]) * 3600.
-        elif position_units == 'pixels':
-            # If input positions are in units of pixels, there's no need to translate
-            pass
-
-        # Calculate distance between the location in the current frame and the preceding frame
-        delta_pos = np.sqrt(delta_ra**2 + delta_dec**2)
-
-        # How many points do we need to follow the given spatial scale?
-        num_sub_frame_points = int(np.ceil(delta_pos / spatial_frequency))
-        if num_sub_frame_points == 1:
-            # If the source moves less than the spatial frequency limit, then we'll only need to evaluate
-            # the PSF once, using the end time of the frame
-            sub_frame_times = [frame_time]
-        elif num_sub_frame_points == 2:
-            # If the source moves just over the spatial frequency limit, then we'll need to evaluate the
-            # PSF twice. Use the start and end time of the frame
-            sub_frame_times = [times_list[i], frame_time]
-        elif num_sub_frame_points > 2:
-            # Here we need to evaluate the PSF three or more times. Use the frame start and end time,
-            # and then spread the remaining times evenly throughout the frame time
-            frame_start_dt = datetime.fromtimestamp(times_list[i], tz=timezone.utc)
-            frame_end_dt = datetime.fromtimestamp(frame_time, tz=timezone.utc)
-            subframe_delta_time = (frame_end_dt - frame_start_dt) / (num_sub_frame_points - 1)
-            sub_frame_times = [to_timestamp(frame_start_dt + subframe_delta_time * n) for n in range(num_sub_frame_points)]
-        elif num_sub_frame_points == 0:
-            # In this case the source didn't move at all. Not even a fraction of a pixel.
-            sub_frame_times = [frame_time]
-
-        if ra_ephemeris is not None and position_units == 'angular':
-            # If ephemeris functions are provided, and positions are in RA, Dec, then calculate the sub
-            # frame locations using those
-            subframe_ra = ra_ephemeris(sub_frame_times)
-            subframe_dec = dec_ephemeris(sub_frame_times)
-        else:
-            # If no ephemeris functions are provided, then use interpolation to get the sub frame locations
-            subframe_ra = ra_interpol(sub_frame_times)
-            subframe_dec = dec_interpol(sub_frame_times)
+    x_or_ra_frames = np.asarray(x_or_ra_frames, dtype=float)
+    y_or_dec_frames = np.asarray(y_or_dec_frames, dtype=float)
+    times_list = np.asarray(times_list, dtype=float)
+
+    # If inputs are in RA, Dec (which are in degrees), translate to arcseconds. If input positions
+    # are in units of pixels, there's no need to translate
+    if position_units == 'angular':
+        scale = 3600.
+    elif position_units == 'pixels':
+        scale = 1.
+    else:
+        raise ValueError("position_units must be 'angular' or 'pixels', not {}".format(position_units))
+
+    # Distance moved between each frame and the preceding frame, for all frames in the exposure at once.
+    delta_x_or_ra = np.diff(x_or_ra_frames) * scale
+    delta_y_or_dec = np.diff(y_or_dec_frames) * scale
+    delta_pos = np.hypot(delta_x_or_ra, delta_y_or_dec)
+
+    # How many points do we need in each frame to follow the given spatial scale?
+    num_sub_frame_points = np.ceil(delta_pos / spatial_frequency).astype(np.int64)
+
+    if len(num_sub_frame_points) == 0:
+        return [], [], []
+
+    # Get the times at which to evaluate the source location, for all frames at once
+    if num_sub_frame_points.max() <= 1:
+        # The source moves less than the spatial frequency limit in every frame, so
+        # only the end time of each frame is needed
+        all_sub_frame_times = times_list[1:]
+        offsets = np.arange(len(times_list))
+    else:
+        all_sub_frame_times, offsets = build_subframe_times(times_list, num_sub_frame_points)
+
+    # Evaluate the positions at all sub-frame times with a single call, and then split the results
+    # back into one array per frame
+    if ra_ephemeris is not None and position_units == 'angular':
+        # If ephemeris functions are provided, and positions are in RA, Dec, then calculate the sub
+        # frame locations using those
+        all_ra = ra_ephemeris(all_sub_frame_times)
+        all_dec = dec_ephemeris(all_sub_frame_times)
+    else:
+        # If no ephemeris functions are provided, then use linear interpolation between the frame
+        # locations to get the sub frame locations
+        all_ra = np.interp(all_sub_frame_times, times_list, x_or_ra_frames)
+        all_dec = np.interp(all_sub_frame_times, times_list, y_or_dec_frames)
 
-        ra_frames_nested.append(subframe_ra)
-        dec_frames_nested.append(subframe_dec)
-        subframe_times_nested.append(sub_frame_times)
+    # The per-frame outputs are views into the flat arrays, so no per-frame arrays are allocated
+    frame_slices = [slice(start, end) for start, end in zip(offsets[:-1], offsets[1:])]
+    ra_frames_nested = [all_ra[frame_slice] for frame_slice in frame_slices]
+    dec_frames_nested = [all_dec[frame_slice] for frame_slice in frame_slices]
+    subframe_times_nested = [all_sub_frame_times[frame_slice] for frame_slice in frame_slices]
 
     return ra_frames_nested, dec_frames_nested, subframe_times_nested
 
 
+def build_subframe_times(times, num_sub_frame_points):
+    """Calculate the times at which to evaluate a source's location within
+    each frame, for all frames at once. If the source moves less than the
+    spatial frequency limit within a frame (i.e. one or zero points are needed),
+    only the end time of the frame is used. Otherwise, the requested number of
+    points are spread evenly from the start time to the end time of the frame.
+
+    Parameters
+    ----------
+    times : numpy.ndarray
+        1D array of N times corresponding to each frame of the integration
+
+    num_sub_frame_points : numpy.ndarray
+        1D array of N-1 integers. Element i gives the number of points needed
+        within the frame that ends at ``times[i + 1]``
+
+    Returns
+    -------
+    sub_frame_times : numpy.ndarray
+        1D array of the sub-frame times for all frames, concatenated
+
+    offsets : numpy.ndarray
+        1D array of N integers. The sub-frame times for the frame ending at
+        ``times[i + 1]`` are ``sub_frame_times[offsets[i]:offsets[i + 1]]``
+    """
+    counts = np.maximum(num_sub_frame_points, 1)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    # Time step between samples, calculated once per frame
+    frame_step = np.diff(times) / np.maximum(counts - 1, 1)
+
+    # Index of each output sample within its frame, then scale to time offsets and
+    # add the frame start times, all in place
+    sub_frame_times = np.arange(offsets[-1], dtype=float)
+    sub_frame_times -= np.repeat(offsets[:-1], counts)
+    sub_frame_times *= np.repeat(frame_step, counts)
+    sub_frame_times += np.repeat(times[:-1], counts)
+
+    # Make sure that the last sample in each frame is exactly the frame end time
+    sub_frame_times[offsets[1:] - 1] = times[1:]
+    return sub_frame_times, offsets
+
+
 def create_interpol_function(ephemeris):
     """Given an ephemeris, create an interpolation function that can be
-    used to get the RA Dec at an arbitrary time
+    used to get the RA Dec at an arbitrary time. The ephemeris is resampled
+    once onto a uniform time grid (with a spacing of at most 1 hour), so that
+    subsequent evaluations are a direct index lookup followed by 3-point
+    parabolic interpolation, rather than a search through the ephemeris times.
 
     Parameters
     ----------
-    ephemeris : astropy.table.Table
+    ephemeris : tup
+        Tuple of (calendar timestamps, RA, Dec) arrays, as returned by
+        read_ephemeris_file()
 
     Returns
     -------
-    eph_interp : scipy.interpolate.interp1d
+    radec_interp : RADecInterpolator
+        Interpolator returning (RA, Dec) in degrees as a function of calendar
+        timestamp. It can also be unpacked into separate RA and Dec functions:
+        ``ra_interp, dec_interp = create_interpol_function(ephemeris)``
     """
-    # In order to create an interpolation function, we need to translate
-    # the datetime objects into calendar timestamps
-    time = [to_timestamp(entry) for entry in ephemeris['Time']]
-    ra_interp = interp1d(time, ephemeris['RA'].data,
-                         bounds_error=True, kind='quadratic')
-    dec_interp = interp1d(time, ephemeris['Dec'].data,
-                          bounds_error=True, kind='quadratic')
-    return ra_interp, dec_interp
+    time, ra, dec = ephemeris
+
+    # RA and Dec share the same time axis, so fit a single quadratic spline to both
+    radec_spline = make_interp_spline(time, np.column_stack([ra, dec]), k=2)
+
+    # Resample onto a uniform grid spanning the ephemeris exactly, with a step no
+    # larger than 1 hour nor larger than 1/4 of the native ephemeris step
+    max_step = min(3600., np.min(np.diff(time)) / 4.)
+    num_steps = max(2, int(np.ceil((time[-1] - time[0]) / max_step)))
+    uniform_time = np.linspace(time[0], time[-1], num_steps + 1)
+    return RADecInterpolator(uniform_grid_interpolator(uniform_time, radec_spline(uniform_time)))
+
+
+class RADecInterpolator:
+    """Evaluate RA and Dec together from a single interpolation function
+    whose output has RA in the first column and Dec in the second, so that
+    the index lookup is shared between the two coordinates.
+
+    Calling the object returns a (RA, Dec) tuple. For code that works with
+    separate RA and Dec functions, the ``ra`` and ``dec`` methods can be used,
+    or the object can be unpacked: ``ra_func, dec_func = radec_interp``
+
+    The most recent query and its result are kept, so that calling ``ra``
+    and then ``dec`` (or the object itself) with the same times only
+    evaluates the interpolation once. Copies of the cached arrays are
+    returned, so callers are free to modify them in place.
+    """
+    def __init__(self, radec_function):
+        self.radec_function = radec_function
+        # (times, ra, dec) of the most recent query. It is replaced with a
+        # single assignment, so that threads sharing the interpolator never
+        # see the times of one query with the positions of another.
+        self._last_query = None
+
+    def __call__(self, times):
+        times = np.asarray(times, dtype=float)
+        last_query = self._last_query
+        if last_query is None or last_query[0].shape != times.shape or not np.array_equal(last_query[0], times):
+            radec = self.radec_function(times)
+            last_query = (times.copy(), np.array(radec[..., 0]), np.array(radec[..., 1]))
+            self._last_query = last_query
+        _, ra, dec = last_query
+        return ra.copy(), dec.copy()
+
+    def __iter__(self):
+        return iter((self.ra, self.dec))
+
+    def ra(self, times):
+        return self(times)[0]
+
+    def dec(self, times):
+        return self(times)[1]
+
+
+def uniform_grid_interpolator(grid, values):
+    """Create an interpolation function for values tabulated on a uniform
+    grid. For each requested point, the nearest grid point is found directly
+    from the grid spacing, and the value is calculated using 3-point parabolic
+    interpolation around that grid point.
+
+    Parameters
+    ----------
+    grid : numpy.ndarray
+        Uniformly spaced, increasing independent variable values. Must contain
+        at least 3 points.
+
+    values : numpy.ndarray
+        Dependent variable values at each point in ``grid``. If 2D, each
+        column is interpolated, sharing the same index calculation.
+
+    Returns
+    -------
+    interpolate : function
+        Function that returns the interpolated values at the input points.
+        A ValueError is raised for points outside the range of ``grid``.
+    """
+    grid = np.asarray(grid, dtype=float)
+    values = np.ascontiguousarray(values, dtype=float)
+
+    # Everything that does not depend on the requested points is computed here and
+    # bound into the returned function as constants
+    grid_start = float(grid[0])
+    grid_end = float(grid[-1])
+    inverse_step = (len(grid) - 1) / (grid_end - grid_start)
+    max_index = len(values) - 2
+    multi_column = values.ndim > 1
+
+    def interpolate(new_x, values=values, grid_start=grid_start, grid_end=grid_end,
+                    inverse_step=inverse_step, max_index=max_index, multi_column=multi_column):
+        new_x = np.asarray(new_x, dtype=float)
+        if new_x.size > 0 and (new_x.min() < grid_start or new_x.max() > grid_end):
+            raise ValueError(("Requested value(s) outside of the interpolation range: {} to {}"
+                              .format(grid_start, grid_end)))
+        fractional_index = (new_x - grid_start) * inverse_step
+        index = np.clip(np.rint(fractional_index).astype(np.int64), 1, max_index)
+        u = fractional_index - index
+        if multi_column:
+            u = u[..., np.newaxis]
+        return (0.5 * u * (u - 1.) * values[index - 1] + (1. - u * u) * values[index]
+                + 0.5 * u * (u + 1.) * values[index + 1])
+
+    return interpolate
+
 
 def ephemeris_from_catalog(nonsidereal_cat, pixel_flag, velocity_flag, start_time, coord_transform, attitude_matrix):
     """Generate ephemeris interpolation functions based on the information in the
@@ -181,62 +328,108 @@ def ephemeris_from_catalog(nonsidereal_cat, pixel_flag, velocity_flag, start_tim
 
     Returns
     -------
-    ra_interp : scipy.interpolate.interp1d
-        1D interpolation function for RA
+    ra_interp : function
+        Function returning RA (degrees) as a function of calendar timestamp,
+        assuming constant motion
 
-    dec_interp : scipy.interpolate.interp1d
-        1D interpolation function for Dec
+    dec_interp : function
+        Function returning Dec (degrees) as a function of calendar timestamp,
+        assuming constant motion
     """
     starttime_datetime = obstime_to_datetime(start_time)
     starttime_calstamp = to_timestamp(starttime_datetime)
     end_time = start_time + (1. / 24.)  # 1 hour later
-    endtime_datetime = obstime_to_datetime(start_time)
-    endtime_calstamp = to_timestamp(starttime_datetime)
+    endtime_datetime = obstime_to_datetime(end_time)
+    endtime_calstamp = to_timestamp(endtime_datetime)
+
+    # Pull the catalog values out once, rather than indexing the table columns in each branch
+    x_or_ra = float(nonsidereal_cat['x_or_RA'][0])
+    y_or_dec = float(nonsidereal_cat['y_or_Dec'][0])
+    x_or_ra_velocity = float(nonsidereal_cat['x_or_RA_velocity'][0])
+    y_or_dec_velocity = float(nonsidereal_cat['y_or_Dec_velocity'][0])
 
     if not pixel_flag:
         # Location given in RA, Dec
-        ra_start = nonsidereal_cat['x_or_RA'][0]
-        dec_start = nonsidereal_cat['y_or_Dec'][0]
+        ra_start = x_or_ra
+        dec_start = y_or_dec
 
         if not velocity_flag:
             # Poitions and velocities given in angular units. RA, Dec, and motion in
             # arcsec per hour
-            ra_end = ra_start + nonsidereal_cat['x_or_RA_velocity'][0] / 3600.
-            dec_end = dec_start + nonsidereal_cat['y_or_Dec_velocity'][0] / 3600.
+            ra_end = ra_start + x_or_ra_velocity / 3600.
+            dec_end = dec_start + y_or_dec_velocity / 3600.
         else:
             # Postions in RA, Dec, but velocities in pixels/hour
             loc_v2, loc_v3 = pysiaf.utils.rotations.getv2v3(attitude_matrix, ra_start, dec_start)
             x_start, y_start = coord_transform.inverse(loc_v2, loc_v3)
-            x_end = x_start + nonsidereal_cat['x_or_RA_velocity'].data[0]
-            y_end = y_start + nonsidereal_cat['y_or_Dec_velocity'].data[0]
+            x_end = x_start + x_or_ra_velocity
+            y_end = y_start + y_or_dec_velocity
             loc_v2, loc_v3 = coord_transform(x_end, y_end)
             ra_end, dec_end = pysiaf.utils.rotations.pointing(attitude_matrix, loc_v2, loc_v3)
     else:
         # Location given in pixels
-        x_start = nonsidereal_cat['x_or_RA'].data[0]
-        y_start = nonsidereal_cat['y_or_Dec'].data[0]
+        x_start = x_or_ra
+        y_start = y_or_dec
         loc_v2, loc_v3 = coord_transform(x_start, y_start)
         ra_start, dec_start = pysiaf.utils.rotations.pointing(attitude_matrix, loc_v2, loc_v3)
 
         if not velocity_flag:
             # Velocities given in RA, Dec arcsec/hour
-            ra_end = ra_start + nonsidereal_cat['x_or_RA_velocity'][0] / 3600.
-            dec_end = dec_start + nonsidereal_cat['y_or_Dec_velocity'][0] / 3600.
+            ra_end = ra_start + x_or_ra_velocity / 3600.
+            dec_end = dec_start + y_or_dec_velocity / 3600.
         else:
             # Velocities given in pixels per hour
-            x_end = x_start + nonsidereal_cat['x_or_RA_velocity'].data[0]
-            y_end = y_start + nonsidereal_cat['y_or_Dec_velocity'].data[0]
+            x_end = x_start + x_or_ra_velocity
+            y_end = y_start + y_or_dec_velocity
             loc_v2, loc_v3 = coord_transform(x_end, y_end)
             ra_end, dec_end = pysiaf.utils.rotations.pointing(attitude_matrix, loc_v2, loc_v3)
 
-
-    ra_interp = interp1d([starttime_calstamp, endtime_calstamp], [ra_start, ra_end], bounds_error=False, kind='linear', fill_value="extrapolate")
-    dec_interp = interp1d([starttime_calstamp, endtime_calstamp], [dec_start, dec_end], bounds_error=False, kind='linear', fill_value="extrapolate")
+    ra_interp = constant_rate_interpolator(starttime_calstamp, ra_start, endtime_calstamp, ra_end)
+    dec_interp = constant_rate_interpolator(starttime_calstamp, dec_start, endtime_calstamp, dec_end)
     return ra_interp, dec_interp
 
 
+def constant_rate_interpolator(x0, y0, x1, y1):
+    """Create a function describing linear motion through two points, which
+    is valid for any input value (i.e. it extrapolates beyond the end points).
+    The slope is calculated once, so that each evaluation is a single
+    multiply-add.
+
+    Parameters
+    ----------
+    x0 : float
+        Independent variable value (e.g. calendar timestamp) of the first point
+
+    y0 : float
+        Dependent variable value (e.g. RA or Dec) of the first point
+
+    x1 : float
+        Independent variable value of the second point
+
+    y1 : float
+        Dependent variable value of the second point
+
+    Returns
+    -------
+    interpolate : function
+        Function that returns the interpolated/extrapolated values of ``y``
+        at the input ``x`` values
+    """
+    x0 = float(x0)
+    y0 = float(y0)
+    slope = (float(y1) - y0) / (float(x1) - x0)
+
+    def interpolate(new_x, x0=x0, y0=y0, slope=slope):
+        return y0 + (np.asarray(new_x, dtype=float) - x0) * slope
+
+    return interpolate
+
+
 def get_ephemeris(method):
-    """Wrapper function to simplify the creation of an ephemeris
+    """Wrapper function to simplify the creation of an ephemeris. Results are
+    cached, so that an ephemeris file used by several sources or exposures
+    is only read and fit once. The cache is keyed on the file's resolved
+    path and modification time, so an updated file is read again.
 
     Parameters
     ----------
@@ -248,10 +441,22 @@ def get_ephemeris(method):
 
     Returns
     -------
-    ephemeris : tup
-        Tuple of interpolation functions for (RA, Dec). Interpolation
-        functions are for RA (or Dec) in degrees as a function of
-        calendar timestamp
+    ephemeris : RADecInterpolator
+        Interpolator for (RA, Dec) in degrees as a function of calendar
+        timestamp. It can be unpacked into separate RA and Dec functions.
+    """
+    if os.path.isfile(method):
+        # Key the cache on the resolved path, so that different spellings of
+        # the same file share an entry
+        method = os.path.realpath(method)
+        return _cached_ephemeris(method, os.path.getmtime(method))
+    return _cached_ephemeris(method, None)
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_ephemeris(method, mtime):
+    """Create the ephemeris for ``get_ephemeris``. ``mtime`` is only used
+    as part of the cache key.
     """
     if method.lower() != 'create':
         ephem = read_ephemeris_file(method)
@@ -280,17 +485,28 @@ def obstime_to_datetime(obstime):
     Returns
     -------
     time_datetime : datetime.datetime
-        Datetime associated with ```obstime```
+        UTC datetime associated with ```obstime```
+    """
+    return Time(obstime, format='mjd').to_datetime(timezone=timezone.utc)
+
+
+def datetimes_to_timestamps(dates):
+    """Convert a list of datetime objects into calendar timestamps in a
+    single array operation. This is equivalent to calling to_timestamp()
+    on each element.
+
+    Parameters
+    ----------
+    dates : list
+        List of datetime.datetime objects (or ISO format strings) without
+        timezone information, which are assumed to be in UTC
+
+    Returns
+    -------
+    cal : numpy.ndarray
+        1D array of calendar timestamps corresponding to the input datetimes
     """
-    mid_time_astropy = Time(obstime, format='mjd')
-    isot = mid_time_astropy.isot
-    date_val, time_val = isot.split('T')
-    time_val_parts = time_val.split(':')
-    fullsec = float(time_val.split(':')[2])
-    microsec = '{}'.format(int((fullsec - int(fullsec)) * 1e6))
-    new_time_val = '{}:{}:{}:{}'.format(time_val_parts[0], time_val_parts[1], int(fullsec), microsec)
-    time_datetime = datetime.strptime("{} {}".format(date_val, new_time_val), "%Y-%m-%d %H:%M:%S:%f")
-    return time_datetime
+    return np.array(dates, dtype='datetime64[us]').astype(np.int64) * 1e-6
 
 
 def to_timestamp(date):
@@ -299,13 +515,16 @@ def to_timestamp(date):
     Parameters
     ----------
     date : datetime.datetime
-        Datetime object e.g. datetime.datetime(2020, 10, 31, 0, 0)
+        Datetime object e.g. datetime.datetime(2020, 10, 31, 0, 0). Datetimes
+        without timezone information are assumed to be in UTC.
 
     Returns
     -------
     cal : calendar.timegm
         Calendar timestamp corresponding to the input datetime
     """
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
     return date.timestamp()
 
 
@@ -319,43 +538,50 @@ def read_ephemeris_file(filename):
 
     Returns
     -------
-    ephemeris : astropy.table.Table
-        Table of ephemeris data containing SkyCoord positions and
-        datetime times.
+    times : numpy.ndarray
+        1D array of calendar timestamps of the ephemeris entries
+
+    ra : numpy.ndarray
+        1D array of RA values (degrees) at ``times``
+
+    dec : numpy.ndarray
+        1D array of Dec values (degrees) at ``times``
     """
     with open(filename) as fobj:
         lines = fobj.readlines()
 
     use_line = False
-    ra = []
-    dec = []
-    time = []
+    rows = []
     for i, line in enumerate(lines):
-        newline = " ".join(line.split())
         if 'Date__(UT)__HR:MN' in line:
             use_line = True
             start_line = i
         if use_line:
-            try:
-                date_val, time_val, ra_h, ra_m, ra_s, dec_d, dec_m, dec_s, *others = newline.split(' ')
-                ra_str = '{}h{}m{}s'.format(ra_h, ra_m, ra_s)
-                dec_str = '{}d{}m{}s'.format(dec_d, dec_m, dec_s)
-                location = SkyCoord(ra_str, dec_str, frame='icrs')
-                ra.append(location.ra.value)
-                dec.append(location.dec.value)
-                dt = datetime.strptime("{} {}".format(date_val, time_val), "%Y-%b-%d %H:%M")
-                time.append(dt)
-            except:
-                pass
+            match = EPHEMERIS_ROW.match(line)
+            if match is not None:
+                rows.append(match.groups())
 
             if (('*****' in line) and (i > (start_line+2))):
                 use_line = False
 
-    ephemeris = Table()
-    ephemeris['Time'] = time
-    ephemeris['RA'] = ra
-    ephemeris['Dec'] = dec
-    return ephemeris
+    if len(rows) == 0:
+        empty = np.array([], dtype=np.float64)
+        return empty, empty, empty
+
+    date_val, time_val, ra_h, ra_m, ra_s, dec_sign, dec_d, dec_m, dec_s = zip(*rows)
+
+    # Translate the dates into ISO format, and convert to timestamps all at once
+    iso_times = ['{}-{}-{}T{}'.format(date[0:4], MONTH_NUMBERS[date[5:8].lower()], date[9:11], hour_min)
+                 for date, hour_min in zip(date_val, time_val)]
+    times = datetimes_to_timestamps(iso_times)
+
+    # Convert sexagesimal RA and Dec to decimal degrees
+    ra = 15. * (np.array(ra_h, dtype=float) + np.array(ra_m, dtype=float) / 60.
+                + np.array(ra_s, dtype=float) / 3600.)
+    dec = (np.array(dec_d, dtype=float) + np.array(dec_m, dtype=float) / 60.
+           + np.array(dec_s, dtype=float) / 3600.)
+    dec[np.array(dec_sign) == '-'] *= -1.
+    return times, ra, dec
 
 
 def query_horizons(object_name, start_date, stop_date, step_size):
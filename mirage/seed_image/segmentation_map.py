@@ -75,5 +75,4 @@ class SegMap():
         """
         yd, xd = image.shape
         stamp = self.segmap[ystart:ystart+yd, xstart:xstart+xd]
-        flag = image >= threshold
-        stamp[flag] = number
+        np.copyto(stamp, number, where=image >= threshold)
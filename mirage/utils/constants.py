@@ -150,7 +150,7 @@ PSF_NORM_MIN = 0.8
 
 # Minimum signal rate for a pixel to be included in the segmentation map.
 SEGMENTATION_MIN_SIGNAL_RATE = 0.031  # ADU/sec
-SUPPORTED_SEGMENTATION_THRESHOLD_UNITS = ['adu/s', 'adu/sec', 'e/s', 'e/sec', 'mjy/str', 'mjy/sr', 'erg/cm2/a', 'erg/cm2/hz']
+SUPPORTED_SEGMENTATION_THRESHOLD_UNITS = frozenset({'adu/s', 'adu/sec', 'e/s', 'e/sec', 'mjy/str', 'mjy/sr', 'erg/cm2/a', 'erg/cm2/hz'})
 
 # For use in converting background MJy/sr to e-/sec
 PRIMARY_MIRROR_AREA = 25.326 * u.meter * u.meter
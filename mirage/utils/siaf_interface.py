@@ -18,6 +18,7 @@ Use
         from mirage.utils import siaf_interface
 
 """
+import functools
 import os
 import logging
 import numpy as np
@@ -126,8 +127,13 @@ def aperture_xy_to_radec(x, y, instrument, aperture, fiducial_ra, fiducial_dec,
     return ra, dec
 
 
+@functools.lru_cache(maxsize=None)
 def get_instance(instrument):
-    """Return an instance of a pysiaf.Siaf object for the given instrument
+    """Return an instance of a pysiaf.Siaf object for the given instrument.
+    Instances are cached, so the SIAF is parsed only once per instrument
+    per process. The returned object is shared between all callers, and
+    its apertures must not be modified. Use ``copy.deepcopy`` if a
+    modified aperture is needed.
 
     Parameters
     ----------
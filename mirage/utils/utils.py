@@ -19,6 +19,7 @@ Dependencies
 """
 
 import copy
+import functools
 import json
 import os
 import logging
@@ -42,6 +43,12 @@ classdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
 log_config_file = os.path.join(classdir, 'logging', LOG_CONFIG_FILENAME)
 logging_functions.create_logger(log_config_file, STANDARD_LOGFILE_NAME)
 
+# Translation tables and whitespace pattern used to turn sexagesimal RA and Dec
+# strings (e.g. 10h12m13.2s, 10d12m2.4s) into colon-separated strings
+RA_SEPARATORS = str.maketrans({'h': ':', 'm': ':', 's': None})
+DEC_SEPARATORS = str.maketrans({'d': ':', 'm': ':', 's': None})
+WHITESPACE = re.compile(r"\s+")
+
 
 def append_dictionary(base_dictionary, added_dictionary, braid=False):
     """Append the content of added_dictionary key-by-key to the base_dictionary.
@@ -1011,6 +1018,31 @@ def sigma_clipped_mean_value_of_image(array, sigma_value):
     return meanval
 
 
+class LazyDict(dict):
+    """Dictionary in which the value for a key can be computed the first
+    time the key is accessed. The functions that compute the values are
+    stored in the ``loaders`` attribute, keyed by dictionary key. Each
+    is called with no arguments, and its result is stored in the
+    dictionary.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loaders = {}
+
+    def __missing__(self, key):
+        if key not in self.loaders:
+            raise KeyError(key)
+        value = self.loaders[key]()
+        self[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self.loaders or super().__contains__(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
 def organize_config_files(offline=False):
     """Organize the names of the various config files for each instrument
 
@@ -1025,8 +1057,10 @@ def organize_config_files(offline=False):
 
     config_info = {}
 
-    config_info['global_subarray_definitions'] = {}
-    config_info['global_readout_patterns'] = {}
+    # The subarray and readout pattern definition tables are only read
+    # when they are first accessed for a given instrument
+    config_info['global_subarray_definitions'] = LazyDict()
+    config_info['global_readout_patterns'] = LazyDict()
     config_info['global_subarray_definition_files'] = {}
     config_info['global_readout_pattern_files'] = {}
 
@@ -1075,8 +1109,10 @@ def organize_config_files(offline=False):
             psf_wing_threshold_file = 'N/A'
             psfpath = 'N/A'
         if instrument in 'niriss fgs nircam'.split():
-            config_info['global_subarray_definitions'][instrument] = asc.read(os.path.join(modpath, 'config', subarray_def_file))
-            config_info['global_readout_patterns'][instrument] = asc.read(os.path.join(modpath, 'config', readout_pattern_file))
+            config_info['global_subarray_definitions'].loaders[instrument] = functools.partial(
+                asc.read, os.path.join(modpath, 'config', subarray_def_file))
+            config_info['global_readout_patterns'].loaders[instrument] = functools.partial(
+                asc.read, os.path.join(modpath, 'config', readout_pattern_file))
         config_info['global_subarray_definition_files'][instrument] = os.path.join(modpath, 'config', subarray_def_file)
         config_info['global_readout_pattern_files'][instrument] = os.path.join(modpath, 'config', readout_pattern_file)
         config_info['global_crosstalk_files'][instrument] = os.path.join(modpath, 'config', crosstalk_file)
@@ -1120,16 +1156,8 @@ def parse_RA_Dec(ra_string, dec_string):
 
     # Convert from HMS or ::: to decimal degrees
     try:
-        ra_string = ra_string.lower()
-        ra_string = ra_string.replace("h", ":")
-        ra_string = ra_string.replace("m", ":")
-        ra_string = ra_string.replace("s", "")
-        ra_string = re.sub(r"\s+", "", ra_string)
-        dec_string = dec_string.lower()
-        dec_string = dec_string.replace("d", ":")
-        dec_string = dec_string.replace("m", ":")
-        dec_string = dec_string.replace("s", "")
-        dec_string = re.sub(r"\s+", "", dec_string)
+        ra_string = WHITESPACE.sub("", ra_string.lower().translate(RA_SEPARATORS))
+        dec_string = WHITESPACE.sub("", dec_string.lower().translate(DEC_SEPARATORS))
 
         values = ra_string.split(":")
         ra_degrees = 15.*(int(values[0]) + int(values[1])/60. + float(values[2])/3600.)
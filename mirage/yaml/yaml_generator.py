@@ -93,19 +93,23 @@ History
 import sys
 import os
 import argparse
-from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import csv
+import hashlib
+import json
 import logging
-from copy import deepcopy
-from glob import glob
+import functools
+from itertools import compress
 import datetime
+import fnmatch
+import pickle
 
-from astropy.time import Time, TimeDelta
 from astropy.table import Table
-from astropy.io import ascii, fits
+from astropy.io import ascii
 import numpy as np
 import pkg_resources
-import pysiaf
 
+import mirage
 from ..apt import apt_inputs
 from ..catalogs.utils import get_nonsidereal_catalog_name, read_nonsidereal_catalog
 from ..logging import logging_functions
@@ -122,6 +126,70 @@ from ..utils.constants import CRDS_FILE_TYPES, SEGMENTATION_MIN_SIGNAL_RATE, \
 from ..utils import siaf_interface, utils
 
 ENV_VAR = 'MIRAGE_DATA'
+CACHE_ENV_VAR = 'MIRAGE_YAML_CACHE'
+
+# SimInput catalog attributes/self.info keys, and the catalog type names used in log messages
+CATALOG_TYPES = [('point_source', 'point source'), ('galaxyListFile', 'galaxy'), ('extended', 'extended'),
+                 ('movingTarg', 'moving point source target'), ('movingTargSersic', 'moving sersic target'),
+                 ('movingTargExtended', 'moving extended target'),
+                 ('movingTargToTrack', 'non-sidereal moving target')]
+
+# Reference file types whose names in reffile_overrides differ from the CRDS names
+CRDS_KEY_MAP = {'badpixmask': 'mask', 'pixelflat': 'flat', 'astrometric': 'distortion'}
+
+# self.info keys for reference files, and the corresponding keys in the
+# CRDS query results (CRDS_REFFILE_COLUMNS) and in the dictionaries
+# returned by SimInput.reffiles_from_dict (OVERRIDE_REFFILE_COLUMNS)
+CRDS_REFFILE_COLUMNS = [('superbias', 'superbias'), ('linearity', 'linearity'), ('saturation', 'saturation'),
+                        ('gain', 'gain'), ('astrometric', 'distortion'), ('photom', 'photom'), ('ipc', 'ipc'),
+                        ('invert_ipc', 'invert_ipc'), ('transmission', 'transmission'),
+                        ('badpixmask', 'mask'), ('pixelflat', 'flat')]
+OVERRIDE_REFFILE_COLUMNS = [('superbias', 'superbias'), ('linearity', 'linearity'), ('saturation', 'saturation'),
+                            ('gain', 'gain'), ('astrometric', 'distortion'), ('photom', 'photom'), ('ipc', 'ipc'),
+                            ('transmission', 'transmission'), ('badpixmask', 'badpixmask'),
+                            ('pixelflat', 'pixelflat')]
+
+# Keys, below the instrument and reference file type, used to find a file in the
+# (lowercased) reffile_overrides dictionary, for each instrument and reference file type
+REFFILE_OVERRIDE_KEYS = {'nircam': {'superbias': ('detector', 'readpattern'), 'linearity': ('detector',),
+                                    'saturation': ('detector',), 'gain': ('detector',),
+                                    'distortion': ('detector', 'filtername', 'exptype'), 'ipc': ('detector',),
+                                    'transmission': ('detector', 'filtername', 'pupilname'),
+                                    'badpixmask': ('detector',), 'pixelflat': ('detector', 'filtername', 'pupilname'),
+                                    'photom': ('detector',)},
+                         'niriss': {'superbias': ('readpattern',), 'linearity': (), 'saturation': (), 'gain': (),
+                                    'distortion': ('pupilname', 'exptype'), 'ipc': (),
+                                    'transmission': ('filtername', 'pupilname'), 'badpixmask': (),
+                                    'pixelflat': ('filtername', 'pupilname'), 'photom': ('detector',)},
+                         'fgs': {'superbias': ('detector', 'readpattern'), 'linearity': ('detector',),
+                                 'saturation': ('detector',), 'gain': ('detector',),
+                                 'distortion': ('detector', 'exptype'), 'ipc': ('detector',),
+                                 'transmission': ('detector',), 'badpixmask': ('detector', 'exptype'),
+                                 'pixelflat': ('detector', 'exptype'), 'photom': ('detector',)}}
+
+# Reference file types to query CRDS for. Transmission files are excluded for now
+CRDS_FILES_NO_TRANSMISSION = tuple(value for value in CRDS_FILE_TYPES.values() if value != 'transmission')
+
+# Maximum number of CRDS lookups (without downloads) to run at once
+MAX_CRDS_QUERY_THREADS = 8
+
+# Maximum number of threads used to write yaml files
+MAX_YAML_WRITE_THREADS = 8
+
+# Maximum number of observations whose V3PA is computed at once. Each one
+# builds a jwst_gtvt Ephemeris, which queries JPL Horizons
+MAX_GTVT_QUERY_THREADS = 4
+
+# Input table columns holding the filter and pupil values, and the prefix of
+# the catalog columns, for non-NIRCam detectors. NIRCam detectors are handled
+# in _wheel_keys
+WHEEL_DETECTOR_KEYS = {'NIS': ('FilterWheel', 'PupilWheel', ''),
+                       'FGS': ('FilterWheel', 'PupilWheel', ''),
+                       'NRS': ('FilterWheel', 'PupilWheel', ''),
+                       'MIR': ('FilterWheel', 'PupilWheel', '')}
+
+# Guider names used in the FGS cosmic ray library file names
+FGS_GUIDER_NAMES = {'G1': 'GUIDER1', 'G2': 'GUIDER2'}
 
 classpath = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
 log_config_file = os.path.join(classpath, 'logging', LOG_CONFIG_FILENAME)
@@ -296,6 +364,10 @@ class SimInput:
         else:
             raise ValueError("reffile_defaults must be 'crds' or 'crds_full_name'")
         self.reffile_overrides = reffile_overrides
+        # Reference file override dictionary whose keys have been made lowercase
+        self._lowercase_reffile_overrides = None
+        # Aperture names already found in the SIAF by write_yaml
+        self._validated_apertures = set()
 
         self.catalogs = catalogs
         self.table_file = None
@@ -341,9 +413,10 @@ class SimInput:
         if (input_xml is not None):
             if self.observation_list_file is None:
                 self.observation_list_file = os.path.join(self.output_dir, 'observation_list.yaml')
-            self.apt_xml_dict, self.xml_skipped_observations = get_observation_dict(self.input_xml, self.observation_list_file, catalogs,
-                                                                                    verbose=self.verbose,
-                                                                                    parameter_overrides=parameter_overrides)
+            self.apt_xml_dict, self.xml_skipped_observations = _cached_get_observation_dict(self.input_xml, self.pointing_file,
+                                                                                            self.observation_list_file, catalogs,
+                                                                                            self.output_dir, verbose=self.verbose,
+                                                                                            parameter_overrides=parameter_overrides)
         else:
             self.logger.error('No input xml file provided. Observation dictionary not constructed.')
 
@@ -355,62 +428,40 @@ class SimInput:
         observation information
         """
         n_exposures = len(self.info['Module'])
-        self.info['point_source'] = [None] * n_exposures
-        self.info['galaxyListFile'] = [None] * n_exposures
-        self.info['extended'] = [None] * n_exposures
         self.info['convolveExtended'] = [False] * n_exposures
-        self.info['movingTarg'] = [None] * n_exposures
-        self.info['movingTargSersic'] = [None] * n_exposures
-        self.info['movingTargExtended'] = [None] * n_exposures
-        self.info['movingTargToTrack'] = [None] * n_exposures
-
-        for i in range(n_exposures):
-            if int(self.info['detector'][i][-1]) < 5:
-                filtkey = 'ShortFilter'
-                pupilkey = 'ShortPupil'
-            else:
-                filtkey = 'LongFilter'
-                pupilkey = 'LongPupil'
-            filt = self.info[filtkey][i]
-            pup = self.info[pupilkey][i]
-
-            if self.point_source[i] is not None:
-                # In here, we assume the user provided a catalog to go with each filter
-                # so now we need to find the filter for each entry and generate a list that makes sense
-                self.info['point_source'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.point_source, 'point source')))
-            else:
-                self.info['point_source'][i] = None
-            if self.galaxyListFile[i] is not None:
-                self.info['galaxyListFile'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.galaxyListFile, 'galaxy')))
-            else:
-                self.info['galaxyListFile'][i] = None
-            if self.extended[i] is not None:
-                self.info['extended'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.extended, 'extended')))
-            else:
-                self.info['extended'][i] = None
-            if self.movingTarg[i] is not None:
-                self.info['movingTarg'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.movingTarg, 'moving point source target')))
-            else:
-                self.info['movingTarg'][i] = None
-            if self.movingTargSersic[i] is not None:
-                self.info['movingTargSersic'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.movingTargSersic, 'moving sersic target')))
-            else:
-                self.info['movingTargSersic'][i] = None
-            if self.movingTargExtended[i] is not None:
-                self.info['movingTargExtended'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.movingTargExtended, 'moving extended target')))
-            else:
-                self.info['movingTargExtended'][i] = None
-            if self.movingTargToTrack[i] is not None:
-                self.info['movingTargToTrack'][i] = os.path.abspath(os.path.expandvars(
-                    self.catalog_match(filt, pup, self.movingTargToTrack, 'non-sidereal moving target')))
-            else:
-                self.info['movingTargToTrack'][i] = None
+        for key, cattype in CATALOG_TYPES:
+            self.info[key] = [None] * n_exposures
+
+        # Catalog lists to search, along with their lowercase names, which are
+        # computed once here rather than in every call to catalog_match. Matches
+        # for each filter/pupil name are also kept, as only a few distinct names
+        # are used across all exposures.
+        catalog_lists = [(key, getattr(self, key), cattype) for key, cattype in CATALOG_TYPES]
+        lowered_catalogs = {key: [(name, name.lower()) for name in catalog_list if name is not None]
+                            for key, catalog_list, cattype in catalog_lists}
+        catalog_matches = {key: {} for key, catalog_list, cattype in catalog_lists}
+
+        # The same few catalog names are matched for many exposures, so
+        # expand and normalize each name only once
+        @functools.lru_cache(maxsize=None)
+        def normalize_path(path):
+            return os.path.abspath(os.path.expandvars(path))
+
+        # Select the short or long wavelength filter and pupil for all exposures at once
+        short_wave = np.array([detector[-1] in '1234' for detector in self.info['detector']], dtype=bool)
+        filters = np.where(short_wave, np.asarray(self.info['ShortFilter'], dtype=object),
+                           np.asarray(self.info['LongFilter'], dtype=object))
+        pupils = np.where(short_wave, np.asarray(self.info['ShortPupil'], dtype=object),
+                          np.asarray(self.info['LongPupil'], dtype=object))
+
+        for i, (filt, pup) in enumerate(zip(filters, pupils)):
+            for key, catalog_list, cattype in catalog_lists:
+                if catalog_list[i] is not None:
+                    # In here, we assume the user provided a catalog to go with each filter
+                    # so now we need to find the filter for each entry and generate a list that makes sense
+                    self.info[key][i] = normalize_path(self.catalog_match(filt, pup, catalog_list, cattype,
+                                                                         lowered_catalog_list=lowered_catalogs[key],
+                                                                         match_cache=catalog_matches[key]))
         if self.convolveExtended is True:
             self.info['convolveExtended'] = [True] * n_exposures
 
@@ -424,23 +475,32 @@ class SimInput:
         """
         all_obs_info, unique_obs_info = self.info_for_all_observations()
 
-        # Add empty placeholders for reference file entries
-        empty_col = np.array([' ' * 500] * len(self.info['Instrument']))
-        superbias_arr = deepcopy(empty_col)
-        linearity_arr = deepcopy(empty_col)
-        saturation_arr = deepcopy(empty_col)
-        gain_arr = deepcopy(empty_col)
-        distortion_arr = deepcopy(empty_col)
-        photom_arr = deepcopy(empty_col)
-        ipc_arr = deepcopy(empty_col)
-        ipc_invert = np.array([True] * len(self.info['Instrument']))
-        transmission_arr = deepcopy(empty_col)
-        badpixmask_arr = deepcopy(empty_col)
-        pixelflat_arr = deepcopy(empty_col)
+        # Index of each exposure's combination within unique_obs_info
+        unique_index = {status: k for k, status in enumerate(unique_obs_info)}
+        exposure_status_index = np.array([unique_index[item] for item in all_obs_info], dtype=np.intp)
 
-        # Loop over combinations, create metadata dict, and get reffiles
+        # Table of reference files, with one row per combination. Use an object
+        # array so that file names of any length can be stored without truncation
+        reffile_table = np.empty((len(unique_obs_info), len(CRDS_REFFILE_COLUMNS)), dtype=object)
+
+        have_overrides = self.reffile_overrides is not None
+
+        # If caching is enabled, CRDS query results are re-used across runs
+        if os.environ.get(CACHE_ENV_VAR) == '1':
+            get_reffiles = crds_tools.get_reffiles_cached
+        else:
+            get_reffiles = crds_tools.get_reffiles
+
+        # Observation date and time used in the CRDS queries. These, along with
+        # the subarray, are the same for all configurations.
+        date = datetime.date.today().isoformat()
+        time = datetime.datetime.now().time().isoformat()
+        status_dict_template = {'DATE-OBS': date, 'TIME-OBS': time, 'SUBARRAY': 'FULL'}
+
+        # Loop over combinations and create metadata dicts
+        crds_queries = []
         for status in unique_obs_info:
-            updated_status = deepcopy(status)
+            updated_status = status
             (instrument, detector, filtername, pupilname, readpattern, exptype) = status
 
             # Make sure NIRISS filter and pupil values are in the correct wheels
@@ -448,14 +508,9 @@ class SimInput:
                 filtername, pupilname = utils.check_niriss_filter(filtername, pupilname)
 
             # Create metadata dictionary
-            date = datetime.date.today().isoformat()
-            current_date = datetime.datetime.now()
-            time = current_date.time().isoformat()
-            status_dict = {'INSTRUME': instrument, 'DETECTOR': detector,
+            status_dict = {**status_dict_template, 'INSTRUME': instrument, 'DETECTOR': detector,
                            'FILTER': filtername, 'PUPIL': pupilname,
-                           'READPATT': readpattern, 'EXP_TYPE': exptype,
-                           'DATE-OBS': date, 'TIME-OBS': time,
-                           'SUBARRAY': 'FULL'}
+                           'READPATT': readpattern, 'EXP_TYPE': exptype}
             if instrument == 'NIRCAM':
                 if detector in ['NRCA5', 'NRCB5', 'NRCALONG', 'NRCBLONG', 'A5', 'B5']:
                     status_dict['CHANNEL'] = 'LONG'
@@ -466,30 +521,44 @@ class SimInput:
                     detector = detector.replace('G', 'GUIDER')
                     status_dict['DETECTOR'] = detector
                     updated_status = (instrument, detector, filtername, pupilname, readpattern, exptype)
+            crds_queries.append((status, updated_status, status_dict))
+
+        # Different combinations can produce identical CRDS parameters once
+        # the NIRISS wheel positions and FGS detector names are normalized,
+        # so query CRDS only once for each distinct set of parameters.
+        query_keys = [tuple(sorted(status_dict.items())) for _, _, status_dict in crds_queries]
+        distinct_queries = dict(zip(query_keys, (status_dict for _, _, status_dict in crds_queries)))
+
+        # Query CRDS. Lookups that only return file names are independent and
+        # dominated by network access, so run them concurrently. When the files
+        # are also downloaded, different configurations often share reference
+        # files, and the CRDS client is not known to be thread-safe, so run
+        # those queries one at a time.
+        download = not self.offline
+
+        def query_crds(status_dict):
+            return get_reffiles(status_dict, CRDS_FILES_NO_TRANSMISSION, download=download)
+
+        if download:
+            query_results = {key: query_crds(status_dict) for key, status_dict in distinct_queries.items()}
+        else:
+            num_threads = max(1, min(MAX_CRDS_QUERY_THREADS, len(distinct_queries)))
+            with ThreadPoolExecutor(max_workers=num_threads) as executor:
+                query_results = dict(zip(distinct_queries, executor.map(query_crds, distinct_queries.values())))
 
-            # Query CRDS
-            # Exclude transmission file for now
-            files_no_transmission = list(CRDS_FILE_TYPES.values())
-            files_no_transmission.remove('transmission')
-            reffiles = crds_tools.get_reffiles(status_dict, files_no_transmission,
-                                               download=not self.offline)
+        # Each combination gets its own copy of the results, as they are updated below
+        all_reffiles = [dict(query_results[key]) for key in query_keys]
 
+        ipc_checks = {}
+        for row, ((status, updated_status, status_dict), reffiles) in enumerate(zip(crds_queries, all_reffiles)):
             # If the user entered reference files in self.reffile_defaults
             # use those over what comes from the CRDS query
-            if self.reffile_overrides is not None:
+            if have_overrides:
                 manual_reffiles = self.reffiles_from_dict(updated_status)
 
-                for key in manual_reffiles:
-                    if manual_reffiles[key] != 'none':
-                        if key == 'badpixmask':
-                            crds_key = 'mask'
-                        elif key == 'pixelflat':
-                            crds_key = 'flat'
-                        elif key == 'astrometric':
-                            crds_key = 'distortion'
-                        else:
-                            crds_key = key
-                        reffiles[crds_key] = manual_reffiles[key]
+                for key, value in manual_reffiles.items():
+                    if value != 'none':
+                        reffiles[CRDS_KEY_MAP.get(key, key)] = value
 
             # Transmission image file
             # For the moment, this file is retrieved from NIRCAM_GRISM or NIRISS_GRISM
@@ -501,38 +570,19 @@ class SimInput:
             # Check to see if a version of the inverted IPC kernel file
             # exists already in the same directory. If so, use that and
             # avoid having to invert the kernel at run time.
-            inverted_file, must_invert = SimInput.inverted_ipc_kernel_check(reffiles['ipc'])
+            # Many configurations share an IPC file, so check each file only once.
+            if reffiles['ipc'] not in ipc_checks:
+                ipc_checks[reffiles['ipc']] = SimInput.inverted_ipc_kernel_check(reffiles['ipc'])
+            inverted_file, must_invert = ipc_checks[reffiles['ipc']]
             if not must_invert:
                 reffiles['ipc'] = inverted_file
             reffiles['invert_ipc'] = must_invert
 
-            # Identify entries in the original list that use this combination
-            match = [i for i, item in enumerate(all_obs_info) if item==status]
-
-            # Populate the reference file names for the matching entries
-            superbias_arr[match] = reffiles['superbias']
-            linearity_arr[match] = reffiles['linearity']
-            saturation_arr[match] = reffiles['saturation']
-            gain_arr[match] = reffiles['gain']
-            distortion_arr[match] = reffiles['distortion']
-            photom_arr[match] = reffiles['photom']
-            ipc_arr[match] = reffiles['ipc']
-            ipc_invert[match] = reffiles['invert_ipc']
-            transmission_arr[match] = reffiles['transmission']
-            badpixmask_arr[match] = reffiles['mask']
-            pixelflat_arr[match] = reffiles['flat']
-
-        self.info['superbias'] = list(superbias_arr)
-        self.info['linearity'] = list(linearity_arr)
-        self.info['saturation'] = list(saturation_arr)
-        self.info['gain'] = list(gain_arr)
-        self.info['astrometric'] = list(distortion_arr)
-        self.info['photom'] = list(photom_arr)
-        self.info['ipc'] = list(ipc_arr)
-        self.info['invert_ipc'] = list(ipc_invert)
-        self.info['transmission'] = list(transmission_arr)
-        self.info['badpixmask'] = list(badpixmask_arr)
-        self.info['pixelflat'] = list(pixelflat_arr)
+            reffile_table[row] = [reffiles[crds_key] for info_key, crds_key in CRDS_REFFILE_COLUMNS]
+
+        # Copy each combination's reference files to all of the exposures that use it
+        for column, (info_key, crds_key) in enumerate(CRDS_REFFILE_COLUMNS):
+            self.info[info_key] = reffile_table[exposure_status_index, column].tolist()
 
     def add_reffile_overrides(self):
         """If the user provides a nested dictionary in
@@ -544,22 +594,17 @@ class SimInput:
         """
         all_obs_info, unique_obs_info = self.info_for_all_observations()
 
-        # Add empty placeholders for reference file entries
-        empty_col = np.array([' ' * 500] * len(self.info['Instrument']))
-        superbias_arr = deepcopy(empty_col)
-        linearity_arr = deepcopy(empty_col)
-        saturation_arr = deepcopy(empty_col)
-        gain_arr = deepcopy(empty_col)
-        distortion_arr = deepcopy(empty_col)
-        photom_arr = deepcopy(empty_col)
-        ipc_arr = deepcopy(empty_col)
-        transmission_arr = deepcopy(empty_col)
-        badpixmask_arr = deepcopy(empty_col)
-        pixelflat_arr = deepcopy(empty_col)
+        # Index of each exposure's combination within unique_obs_info
+        unique_index = {status: k for k, status in enumerate(unique_obs_info)}
+        exposure_status_index = np.array([unique_index[item] for item in all_obs_info], dtype=np.intp)
+
+        # Table of reference files, with one row per combination. Use an object
+        # array so that file names of any length can be stored without truncation
+        reffile_table = np.empty((len(unique_obs_info), len(OVERRIDE_REFFILE_COLUMNS)), dtype=object)
 
         # Loop over combinations, create metadata dict, and get reffiles
-        for status in unique_obs_info:
-            updated_status = deepcopy(status)
+        for row, status in enumerate(unique_obs_info):
+            updated_status = status
             (instrument, detector, filtername, pupilname, readpattern, exptype) = status
 
             if instrument == 'FGS':
@@ -575,33 +620,13 @@ class SimInput:
                 if manual_reffiles[key] == 'none':
                     manual_reffiles[key] = 'crds'
 
-            # Identify entries in the original list that use this combination
-            match = [i for i, item in enumerate(all_obs_info) if item==status]
-
-            # Populate the reference file names for the matching entries
-            superbias_arr[match] = manual_reffiles['superbias']
-            linearity_arr[match] = manual_reffiles['linearity']
-            saturation_arr[match] = manual_reffiles['saturation']
-            gain_arr[match] = manual_reffiles['gain']
-            distortion_arr[match] = manual_reffiles['distortion']
-            photom_arr[match] = manual_reffiles['photom']
-            ipc_arr[match] = manual_reffiles['ipc']
-            transmission_arr[match] = manual_reffiles['transmission']
-            badpixmask_arr[match] = manual_reffiles['badpixmask']
-            pixelflat_arr[match] = manual_reffiles['pixelflat']
-
-        self.info['superbias'] = list(superbias_arr)
-        self.info['linearity'] = list(linearity_arr)
-        self.info['saturation'] = list(saturation_arr)
-        self.info['gain'] = list(gain_arr)
-        self.info['astrometric'] = list(distortion_arr)
-        self.info['photom'] = list(photom_arr)
-        self.info['ipc'] = list(ipc_arr)
-        self.info['transmission'] = list(transmission_arr)
-        self.info['badpixmask'] = list(badpixmask_arr)
-        self.info['pixelflat'] = list(pixelflat_arr)
-
-    def catalog_match(self, filter, pupil, catalog_list, cattype):
+            reffile_table[row] = [manual_reffiles[manual_key] for info_key, manual_key in OVERRIDE_REFFILE_COLUMNS]
+
+        # Copy each combination's reference files to all of the exposures that use it
+        for column, (info_key, manual_key) in enumerate(OVERRIDE_REFFILE_COLUMNS):
+            self.info[info_key] = reffile_table[exposure_status_index, column].tolist()
+
+    def catalog_match(self, filter, pupil, catalog_list, cattype, lowered_catalog_list=None, match_cache=None):
         """
         Given a filter and pupil value, along with a list of input
         catalogs, find the catalog names that contain each filter/
@@ -617,6 +642,12 @@ class SimInput:
             List of catalog filenames
         cattype : str
             Type of catalog in the list.
+        lowered_catalog_list : list
+            Optional list of (filename, lowercase filename) tuples for the
+            entries in ``catalog_list``. If None, it is created here.
+        match_cache : dict
+            Optional dictionary of previous matches within ``catalog_list``,
+            keyed by lowercase filter/pupil name. New matches are added to it.
 
         Returns
         -------
@@ -625,21 +656,26 @@ class SimInput:
             input filter/pupil element
         """
         if pupil[0].upper() == 'F':
-            match = [s for s in catalog_list if pupil.lower() in s.lower()]
-            if len(match) == 0:
-                self.no_catalog_match(pupil, cattype)
-                return None
-            elif len(match) > 1:
-                self.multiple_catalog_match(pupil, cattype, match)
-            return match[0]
+            element = pupil
+        else:
+            element = filter
+        element_lower = element.lower()
+
+        if match_cache is not None and element_lower in match_cache:
+            match = match_cache[element_lower]
         else:
-            match = [s for s in catalog_list if filter.lower() in s.lower()]
-            if len(match) == 0:
-                self.no_catalog_match(filter, cattype)
-                return None
-            elif len(match) > 1:
-                self.multiple_catalog_match(filter, cattype, match)
-            return match[0]
+            if lowered_catalog_list is None:
+                lowered_catalog_list = [(s, s.lower()) for s in catalog_list]
+            match = [s for s, s_lower in lowered_catalog_list if element_lower in s_lower]
+            if match_cache is not None:
+                match_cache[element_lower] = match
+
+        if len(match) == 0:
+            self.no_catalog_match(element, cattype)
+            return None
+        elif len(match) > 1:
+            self.multiple_catalog_match(element, cattype, match)
+        return match[0]
 
     @logging_functions.log_fail
     def create_inputs(self):
@@ -673,10 +709,10 @@ class SimInput:
             # ephemeris file or target velocity
             self.nonsidereal_pointing_updates()
 
-            # Get the correct pointing for each aperture
-            siaf_dictionary = {}
-            for instrument_name in np.unique(self.info['Instrument']):
-                siaf_dictionary[instrument_name] = siaf_interface.get_instance(instrument_name)
+            # Get the correct pointing for each aperture. ra_dec_update does
+            # not modify the SIAF instances, so the cached ones can be used.
+            siaf_dictionary = {instrument_name: siaf_interface.get_instance(instrument_name)
+                               for instrument_name in np.unique(self.info['Instrument'])}
             self.info = apt_inputs.ra_dec_update(self.info, siaf_dictionary)
 
             # Add a list of output yaml names to the dictionary
@@ -684,7 +720,12 @@ class SimInput:
 
         elif self.table_file is not None:
             self.logger.info('Reading table file: {}'.format(self.table_file))
-            info = ascii.read(self.table_file)
+            # Tables saved by create_inputs are csv files, which can be read directly by the
+            # fast csv reader. Other files are read with format guessing.
+            if self.table_file.lower().endswith('.csv'):
+                info = ascii.read(self.table_file, format='csv', fast_reader=True, guess=False)
+            else:
+                info = ascii.read(self.table_file)
             self.info = self.table_to_dict(info)
             final_file = self.table_file + '_with_yaml_parameters.csv'
 
@@ -700,18 +741,13 @@ class SimInput:
         # file has been generated, it will effectively always be
         # up to date, even as reference files change.
         if self.reffile_defaults == 'crds':
-            column_data = ['crds'] * len(self.info['Instrument'])
-            self.info['superbias'] = column_data
-            self.info['linearity'] = column_data
-            self.info['saturation'] = column_data
-            self.info['gain'] = column_data
-            self.info['astrometric'] = column_data
-            self.info['photom'] = column_data
-            self.info['ipc'] = column_data
-            self.info['invert_ipc'] = np.array([True] * len(self.info['Instrument']))
-            self.info['transmission'] = column_data
-            self.info['badpixmask'] = column_data
-            self.info['pixelflat'] = column_data
+            # All reference file columns share a single list, which is never
+            # modified in place
+            n_exposures = len(self.info['Instrument'])
+            column_data = ['crds'] * n_exposures
+            for info_key, crds_key in CRDS_REFFILE_COLUMNS:
+                self.info[info_key] = column_data
+            self.info['invert_ipc'] = np.ones(n_exposures, dtype=bool)
 
             # If the user provided a dictionary of reference files to
             # override some/all of those from CRDS, then enter those
@@ -732,25 +768,28 @@ class SimInput:
             raise ValueError(("self.reffile_defaults is not equal to 'crds' "
                               "nor 'crds_full_name'. Unable to proceed."))
 
-        # Get the list of dark current files to use
-        darks = []
-        lindarks = []
-        for instrument, det in zip([s.lower() for s in self.info['Instrument']], self.info['detector']):
-            instrument = instrument.lower()
-            darks.append(self.get_dark(instrument, det))
-            lindarks.append(self.get_lindark(instrument, det))
+        # Lowercase instrument names, computed once and used below
+        instruments_lower = np.char.lower(np.asarray(self.info['Instrument'], dtype=str))
+        instruments = instruments_lower.tolist()
+
+        # Get the list of dark current files to use. Only the type of dark
+        # that will be used needs to be looked up.
+        instrument = instruments[-1] if instruments else ''
 
         # If linearized darks are to be used, set the darks to None
         if self.use_linearized_darks:
-            self.info['dark'] = [None] * len(darks)
+            lindarks = self.select_darks(self.lindark_list, instruments, self.info['detector'])
+            darks = [None] * len(lindarks)
+            self.info['dark'] = darks
             self.info['lindark'] = lindarks
-            if set(lindarks) == set([None]):
+            if lindarks and all(lindark is None for lindark in lindarks):
                 raise RuntimeError(("ERROR: Linearized darks requested, but no linearized dark files "
                                     "found. Check: {}").format(os.path.join(os.path.expandvars('$MIRAGE_DATA'), instrument)))
         else:
+            darks = self.select_darks(self.dark_list, instruments, self.info['detector'])
             self.info['dark'] = darks
-            self.info['lindark'] = [None] * len(lindarks)
-            if set(darks) == set([None]):
+            self.info['lindark'] = [None] * len(darks)
+            if darks and all(dark is None for dark in darks):
                 raise RuntimeError(("ERROR: Raw darks requested, but no raw dark files found. "
                                     "Check: {}").format(os.path.join(os.path.expandvars('$MIRAGE_DATA'), instrument)))
 
@@ -761,110 +800,114 @@ class SimInput:
         # self.info['bkgdrate'] = np.array([self.bkgdrate]*len(self.info['Mode']))
 
         # grism entries
-        grism_source_image = ['False'] * len(self.info['Mode'])
-        grism_input_only = ['False'] * len(self.info['Mode'])
-        for i in range(len(self.info['Mode'])):
-            if self.info['Mode'][i].lower() in ['wfss', 'ts_grism']:
-                if self.info['detector'][i] == 'NIS' or self.info['detector'][i][-1] == '5':
-                    grism_source_image[i] = 'True'
-                    grism_input_only[i] = 'True'
-                # SW detectors shouldn't be wfss
-                if self.info['Instrument'][i] == 'NIRCAM' and self.info['detector'][i][-1] != '5':
-                    if self.info['Mode'][i] == 'wfss':
-                        self.info['Mode'][i] = 'imaging'
-                    elif self.info['Mode'][i] == 'ts_grism':
-                        self.info['Mode'][i] = 'ts_imaging'
-        self.info['grism_source_image'] = grism_source_image
-        self.info['grism_input_only'] = grism_input_only
+        # Modes are kept in an object array so that longer mode names are not truncated
+        modes = np.array(self.info['Mode'], dtype=object)
+        lower_modes = np.char.lower(modes.astype(str))
+        detectors = np.asarray(self.info['detector'], dtype=str)
+        long_wave = np.char.endswith(detectors, '5')
+        grism_mode = np.isin(lower_modes, ['wfss', 'ts_grism'])
+        grism_source = grism_mode & ((detectors == 'NIS') | long_wave)
+        self.info['grism_source_image'] = np.where(grism_source, 'True', 'False').tolist()
+        self.info['grism_input_only'] = np.where(grism_source, 'True', 'False').tolist()
+
+        # SW detectors shouldn't be wfss
+        nircam_short_wave = (np.asarray(self.info['Instrument'], dtype=str) == 'NIRCAM') & ~long_wave
+        modes[nircam_short_wave & (modes == 'wfss')] = 'imaging'
 
         # Grism TSO adjustments. SW detectors should be flagged ts_imaging mode.
-        for i in range(len(self.info['Mode'])):
-            if self.info['Mode'][i].lower() == 'ts_grism':
-                if self.info['detector'][i][-1] != '5':
-                    self.info['Mode'][i] = 'ts_imaging'
+        modes[(lower_modes == 'ts_grism') & ~long_wave] = 'ts_imaging'
+        self.info['Mode'] = modes.tolist()
 
         # level-3 associated keywords that are not present in APT file.
         # not quite sure how to populate these
         self.info['visit_group'] = ['01'] * len(self.info['Mode'])
         # self.info['sequence_id'] = ['1'] * len(self.info['Mode'])
-        seq = []
-        for par in self.info['CoordinatedParallel']:
-            if par.lower() == 'true':
-                seq.append('2')
-            if par.lower() == 'false':
-                seq.append('1')
-        self.info['sequence_id'] = seq
+        coord_parallel = np.char.lower(np.asarray(self.info['CoordinatedParallel'], dtype=str))
+        self.info['sequence_id'] = np.where(coord_parallel == 'true', '2', '1').tolist()
 
         # Deal with user-provided PSFs that differ across observations/visits/exposures
         self.info['psfpath'] = self.get_psf_path()
 
-        table = Table(self.info)
-        table.write(final_file, format='csv', overwrite=True)
+        _write_csv_columns(self.info, final_file)
         self.logger.info('Updated observation table file saved to {}'.format(final_file))
 
         # Now go through the lists one element at a time
-        # and create a yaml file for each.
-        yamls = []
-        # for i in range(len(detector_labels)):
-        for i, instrument in enumerate(self.info['Instrument']):
-            instrument = instrument.lower()
-            if instrument not in 'fgs nircam niriss'.split():
-                # do not write files for MIRI and NIRSpec
-                continue
-            elif instrument=='nircam':
-                # special case for coronagraphy:
-                # only 1 detector at a time is returned to the ground, depending on selected mask.
-                # do not write files for the detectors that are not downloaded.
-                if self.info['APTTemplate'][i]=='NircamCoron':
-                    # do not write files for detectors not read out
-                    # the ones not used are tagged with 'n/a' in ReadAPTXML.read_nircam_coronagraphy_template
-                    # and recall NIRCam coronagraphy always uses module A
-                    if ((self.info['LongPupil'][i]=='n/a' and self.info['detector'][i]=='A5') or
-                        (self.info['ShortPupil'][i]=='n/a' and self.info['detector'][i] in ['A1','A2','A3','A4'])):
-                        print(f"Skipping {self.info['yamlfile'][i]} because this coronagraphy obs does not use that detector")
-                        continue
-
-                    # SW coronagraphy exposures that use MASKRND collect data from A2 only
-                    if (self.info['ShortPupil'][i] == 'MASKRND' and self.info['detector'][i] != 'A2'):
-                        print(f"Skipping yaml for {self.info['detector'][i]} with {self.info['ShortPupil'][i]}")
-                        continue
-
-                    # SW coronagraphy exposures that use MASKSWB collect data from A4 only
-                    if (self.info['ShortPupil'][i] == 'MASKSWB' and self.info['detector'][i] != 'A4'):
-                        print(f"Skipping yaml for {self.info['detector'][i]} with {self.info['ShortPupil'][i]}")
-                        continue
-
-            file_dict = {}
-            for key in self.info:
-                file_dict[key] = self.info[key][i]
-
-            # break dither number into numbers for primary
-            # and subpixel dithers
-            tot_dith = int(file_dict['dither'])
-            # primarytot = int(file_dict['PrimaryDithers'])
-            primarytot = int(file_dict['number_of_dithers'])
-
-            if isinstance(file_dict['SubpixelPositions'], str) and file_dict['SubpixelPositions'].upper() == 'NONE':
-                subpixtot = 1
+        # and collect the information for each yaml file.
+        file_dicts = []
+        # Iterate over the rows of self.info by zipping the columns together once,
+        # rather than indexing every column for each exposure
+        info_keys = list(self.info.keys())
+        info_rows = zip(*[self.info[key] for key in info_keys])
+
+        # Configuration files for each instrument, looked up once per instrument
+        config_file_keys = {'subarray_def_file': 'global_subarray_definition_files',
+                            'readpatt_def_file': 'global_readout_pattern_files',
+                            'crosstalk_file': 'global_crosstalk_files',
+                            'filtpupilcombo_file': 'global_filtpupilcombo_files',
+                            'filter_position_file': 'global_filter_position_files',
+                            'flux_cal_file': 'global_flux_cal_files',
+                            'psf_wing_threshold_file': 'global_psf_wing_threshold_file'}
+        instrument_config_files = {}
+        for inst in set(instruments):
+            if inst in ['fgs', 'nircam', 'niriss']:
+                instrument_config_files[inst] = {key: self.config_information[config_key][inst]
+                                                 for key, config_key in config_file_keys.items()}
+
+        # Break the dither numbers into numbers for primary and subpixel dithers,
+        # for all exposures that yaml files are written for
+        yaml_instrument = np.isin(instruments_lower, ['fgs', 'nircam', 'niriss'])
+        total_dithers = np.array([int(dither) if use else 1
+                                  for dither, use in zip(self.info['dither'], yaml_instrument)], dtype=int)
+        subpix_totals = np.array([_number_of_subpixel_positions(positions) if use else 1
+                                  for positions, use in zip(self.info['SubpixelPositions'], yaml_instrument)],
+                                 dtype=int)
+        primary_dither_nums = np.ceil(total_dithers / subpix_totals).astype(int)
+        subpix_dither_nums = (total_dithers - 1) % subpix_totals + 1
+        # Find the exposures that yaml files are written for. No files are written
+        # for MIRI and NIRSpec. For NIRCam coronagraphy, only 1 detector at a time
+        # is returned to the ground, depending on the selected mask, so files are
+        # not written for the detectors that are not downloaded.
+        # The detectors not used are tagged with 'n/a' in
+        # ReadAPTXML.read_nircam_coronagraphy_template, and recall NIRCam
+        # coronagraphy always uses module A
+        detector_names = np.asarray(self.info['detector'], dtype=object)
+        short_pupils = np.asarray(self.info['ShortPupil'], dtype=object)
+        long_pupils = np.asarray(self.info['LongPupil'], dtype=object)
+        coronagraphy = (instruments_lower == 'nircam') & (np.asarray(self.info['APTTemplate'], dtype=object) == 'NircamCoron')
+        unused_detector = coronagraphy & (((long_pupils == 'n/a') & (detector_names == 'A5')) |
+                                          ((short_pupils == 'n/a') & np.isin(detector_names, ['A1', 'A2', 'A3', 'A4'])))
+        # SW coronagraphy exposures that use MASKRND collect data from A2 only,
+        # and those that use MASKSWB collect data from A4 only
+        unused_mask = coronagraphy & ~unused_detector & (((short_pupils == 'MASKRND') & (detector_names != 'A2')) |
+                                                         ((short_pupils == 'MASKSWB') & (detector_names != 'A4')))
+        for i in np.flatnonzero(unused_detector | unused_mask):
+            if unused_detector[i]:
+                print(f"Skipping {self.info['yamlfile'][i]} because this coronagraphy obs does not use that detector")
             else:
-                try:
-                    subpixtot = int(file_dict['SubpixelPositions'])
-                except:
-                    subpixtot = int(file_dict['SubpixelPositions'][0])
-            primary_dither = np.ceil(1. * tot_dith / subpixtot)
-            file_dict['primary_dither_num'] = int(primary_dither)
-            subpix_dither = (tot_dith-1) % subpixtot
-            file_dict['subpix_dither_num'] = subpix_dither + 1
-
-            file_dict['subarray_def_file'] = self.config_information['global_subarray_definition_files'][instrument]
-            file_dict['readpatt_def_file'] = self.config_information['global_readout_pattern_files'][instrument]
-            file_dict['crosstalk_file'] = self.config_information['global_crosstalk_files'][instrument]
-            file_dict['filtpupilcombo_file'] = self.config_information['global_filtpupilcombo_files'][instrument]
-            file_dict['filter_position_file'] = self.config_information['global_filter_position_files'][instrument]
-            file_dict['flux_cal_file'] = self.config_information['global_flux_cal_files'][instrument]
-            file_dict['psf_wing_threshold_file'] = self.config_information['global_psf_wing_threshold_file'][instrument]
-            fname = self.write_yaml(file_dict)
-            yamls.append(fname)
+                print(f"Skipping yaml for {self.info['detector'][i]} with {self.info['ShortPupil'][i]}")
+        write_yaml_file = yaml_instrument & ~unused_detector & ~unused_mask
+
+        for i, (instrument, row_values) in compress(enumerate(zip(instruments, info_rows)), write_yaml_file):
+            file_dict = dict(zip(info_keys, row_values))
+
+            file_dict['primary_dither_num'] = int(primary_dither_nums[i])
+            file_dict['subpix_dither_num'] = int(subpix_dither_nums[i])
+
+            file_dict.update(instrument_config_files[instrument])
+            file_dicts.append(file_dict)
+
+        # Draw the cosmic ray and Poisson seeds for all files at once, in
+        # exposure order, so that they do not depend on the order in which
+        # the threads below write the files
+        seeds = np.random.randint(1, 2**32-2, size=(len(file_dicts), 2)).tolist()
+        for file_dict, (cosmic_ray_seed, poisson_seed) in zip(file_dicts, seeds):
+            file_dict['cosmic_ray_seed'] = cosmic_ray_seed
+            file_dict['poisson_seed'] = poisson_seed
+
+        # The yaml files are independent of one another, so write them
+        # concurrently. The output list keeps the order of the exposures.
+        with ThreadPoolExecutor(max_workers=MAX_YAML_WRITE_THREADS) as executor:
+            yamls = list(executor.map(self.write_yaml, file_dicts))
         self.yaml_files = yamls
 
         # Write out summary of all written yaml files
@@ -874,24 +917,45 @@ class SimInput:
 
         self.logger.info('\n')
 
+        # Group the mosaic numbers and yaml files by observation number in a single pass
+        mosaic_numbers_by_obs = {}
+        for m in mosaic_numbers:
+            mosaic_numbers_by_obs.setdefault(m[7:10], []).append(m)
+
+        # Observation, activity and exposure number fields of all yaml file names,
+        # with the file indexes for each observation found by sorting once
+        yaml_obs = _substrings(self.info['yamlfile'], 7, 10)
+        yaml_activities = _substrings(self.info['yamlfile'], 17, 29)
+        yaml_exposures = _substrings(self.info['yamlfile'], 20, 25)
+        yaml_order = np.argsort(yaml_obs, kind='stable')
+        yaml_unique_obs, yaml_starts, yaml_counts = np.unique(yaml_obs[yaml_order], return_index=True,
+                                                              return_counts=True)
+        yaml_index_lookup = {obs_id: yaml_order[start: start + count]
+                             for obs_id, start, count in zip(yaml_unique_obs, yaml_starts, yaml_counts)}
+
+        # Indexes of the entries in self.info for each observation, found by
+        # sorting the observation numbers once
+        obs_id_int = np.array([int(ele) for ele in self.info['ObservationID']])
+        obs_order = np.argsort(obs_id_int, kind='stable')
+        unique_obs_ids, obs_starts, obs_counts = np.unique(obs_id_int[obs_order], return_index=True,
+                                                           return_counts=True)
+        obs_index_lookup = {obs_id: obs_order[start: start + count]
+                            for obs_id, start, count in zip(unique_obs_ids, obs_starts, obs_counts)}
+        all_parallel_instruments = np.array(self.info['ParallelInstrument'])
+        all_detectors = np.array(self.info['detector'])
+
         total_exposures = 0
         for obs in obs_ids:
-            visit_list = list(set([m[10:] for m in mosaic_numbers
-                                   if m[7:10] == obs]))
+            visit_list = list(set([m[10:] for m in mosaic_numbers_by_obs.get(obs, [])]))
             n_visits = len(visit_list)
-            activity_list = list(set([vf[17:29] for vf in self.info['yamlfile']
-                                      if vf[7:10] == obs]))
-            n_activities = len(activity_list)
-            exposure_list = list(set([vf[20:25] for vf in self.info['yamlfile']
-                                      if vf[7:10] == obs]))
-            n_exposures = len(exposure_list) * n_activities
+            yaml_indexes = yaml_index_lookup.get(obs, np.array([], dtype=int))
+            n_activities = len(np.unique(yaml_activities[yaml_indexes]))
+            n_exposures = len(np.unique(yaml_exposures[yaml_indexes])) * n_activities
             total_exposures += n_exposures
-            all_obs_files = [m for m in self.info['yamlfile'] if m[7:10] == obs]
-            total_files = len(all_obs_files)
+            total_files = len(yaml_indexes)
 
-            obs_id_int = np.array([int(ele) for ele in self.info['ObservationID']])
-            obs_indexes = np.where(obs_id_int == int(obs))[0]
-            obs_entries = np.array(self.info['ParallelInstrument'])[obs_indexes]
+            obs_indexes = obs_index_lookup.get(int(obs), np.array([], dtype=int))
+            obs_entries = all_parallel_instruments[obs_indexes]
             coord_par = self.info['CoordinatedParallel'][obs_indexes[0]]
             if coord_par:
                 par_indexes = np.where(obs_entries)[0]
@@ -908,10 +972,10 @@ class SimInput:
 
             if prime_instrument.upper() == 'NIRCAM':
                 module = self.info['Module'][obs_indexes[pri_indexes[0]]]
-                detectors_used = np.array(self.info['detector'])[obs_indexes[pri_indexes]]
+                detectors_used = all_detectors[obs_indexes[pri_indexes]]
             elif parallel_instrument.upper() == 'NIRCAM':
                 module = self.info['Module'][obs_indexes[par_indexes[0]]]
-                detectors_used = np.array(self.info['detector'])[obs_indexes[par_indexes]]
+                detectors_used = all_detectors[obs_indexes[par_indexes]]
 
             if ((prime_instrument.upper() == 'NIRCAM') or (parallel_instrument.upper() == 'NIRCAM')):
                 if module == 'ALL':
@@ -986,16 +1050,24 @@ class SimInput:
            ipcfile is the name of the IPC kernel file to use, and invstatus
            lists whether the kernel needs to be inverted or not.
         """
-        for ifile in inputipc:
-            kernel = fits.getdata(ifile)
-            kshape = kernel.shape
+        from astropy.io import fits
 
-            # If kernel is 4 dimensional, extract the 3x3 kernel associated
-            # with a single pixel
-            if len(kernel.shape) == 4:
-                kernel = kernel[:, :, int(kshape[2]/2), int(kshape[2]/2)]
+        for ifile in inputipc:
+            # Memory map the file, so that only the central kernel value is read
+            with fits.open(ifile, memmap=True) as hdulist:
+                # Same HDU selection as fits.getdata
+                hdu = hdulist[0] if hdulist[0].data is not None else hdulist[1]
+                kernel = hdu.data
+                kshape = kernel.shape
+
+                # If kernel is 4 dimensional, use the 3x3 kernel associated
+                # with a single pixel
+                if len(kshape) == 4:
+                    center_value = float(kernel[1, 1, int(kshape[2]/2), int(kshape[2]/2)])
+                else:
+                    center_value = float(kernel[1, 1])
 
-            if kernel[1, 1] < 1.0:
+            if center_value < 1.0:
                 return (ifile, False)
         # If no inverted kernel was found, just return the first file
         return (inputipc[0], True)
@@ -1046,6 +1118,49 @@ class SimInput:
         else:
             return None
 
+    @staticmethod
+    def select_darks(dark_dict, instruments, detectors):
+        """Select a dark current file for each exposure. This gives the same
+        result as calling ``get_dark`` or ``get_lindark`` for each exposure,
+        but the list of files is looked up once for each (instrument,
+        detector) pair, and random selections are made for all exposures
+        with that pair at once.
+
+        Parameters
+        ----------
+        dark_dict : dict
+            Nested dictionary of dark file lists, keyed by instrument and
+            then detector (e.g. ``self.dark_list`` or ``self.lindark_list``)
+
+        instruments : list
+            Lowercase instrument name for each exposure
+
+        detectors : list
+            Detector name for each exposure
+
+        Returns
+        -------
+        selected : list
+            Name of the dark current file to use for each exposure. None for
+            exposures where no files are available.
+        """
+        exposure_indexes = {}
+        for index, pair in enumerate(zip(instruments, detectors)):
+            exposure_indexes.setdefault(pair, []).append(index)
+
+        selected = [None] * len(detectors)
+        for (instrument, detector), indexes in exposure_indexes.items():
+            files = dark_dict[instrument][detector]
+            if len(files) == 1:
+                choices = [files[0]] * len(indexes)
+            elif len(files) > 1:
+                choices = [files[rand_index] for rand_index in np.random.randint(0, len(files) - 1, size=len(indexes))]
+            else:
+                continue
+            for index, choice in zip(indexes, choices):
+                selected[index] = choice
+        return selected
+
     def get_readpattern_defs(self, filename=None):
         """Read in the readpattern definition file and return table.
 
@@ -1056,11 +1171,9 @@ class SimInput:
         filename : str
             Path to input file name
         """
-        if filename is not None:
-            return ascii.read(filename)
-
-        tab = ascii.read(self.readpatt_def_file)
-        return tab
+        if filename is None:
+            filename = self.readpatt_def_file
+        return _read_definition_table(filename).copy()
 
     def get_reffile(self, refs, detector):
         """
@@ -1097,11 +1210,9 @@ class SimInput:
         filename : str
             Path to input file name
         """
-        if filename is not None:
-            return ascii.read(filename)
-
-        sub = ascii.read(self.subarray_def_file)
-        return sub
+        if filename is None:
+            filename = self.subarray_def_file
+        return _read_definition_table(filename).copy()
 
     def info_for_all_observations(self):
         """For a given dictionary of observation information, pull out the
@@ -1120,37 +1231,41 @@ class SimInput:
             only one copy of each unique tuple.
         """
         # Get all combinations of instrument, detector, filter, exp_type,
-        all_combinations = []
-        for i in range(len(self.info['Instrument'])):
-            # Get instrument information for the exposure
-            instrument = self.info['Instrument'][i]
-            detector = self.info['detector'][i]
-            if instrument == 'NIRCAM':
-                detector = 'NRC{}'.format(detector)
-                if '5' in detector:
-                    filtername = self.info['LongFilter'][i]
-                    pupilname = self.info['LongPupil'][i]
-                    detector = detector.replace('5', 'LONG')
-                else:
-                    filtername = self.info['ShortFilter'][i]
-                    pupilname = self.info['ShortPupil'][i]
-            elif instrument == 'NIRISS':
-                filtername = self.info['ShortFilter'][i]
-                pupilname = self.info['ShortPupil'][i]
-            elif instrument == 'FGS':
-                filtername = 'N/A'
-                pupilname = 'N/A'
-            readpattern = self.info['ReadoutPattern'][i]
-
-            if instrument == 'NIRCAM':
-                exptype = 'NRC_IMAGE'
-            elif instrument == 'NIRISS':
-                exptype = 'NIS_IMAGE'
-            elif instrument == 'FGS':
-                exptype = 'FGS_IMAGE'
-
-            entry = (instrument, detector, filtername, pupilname, readpattern, exptype)
-            all_combinations.append(entry)
+        # building each column for all exposures at once
+        instruments = np.asarray(self.info['Instrument'], dtype=object)
+        detectors = np.asarray(self.info['detector'], dtype=str)
+        is_nircam = instruments == 'NIRCAM'
+        is_niriss = instruments == 'NIRISS'
+        is_fgs = instruments == 'FGS'
+
+        nircam_detectors = np.char.add('NRC', detectors)
+        nircam_long = is_nircam & (np.char.find(nircam_detectors, '5') >= 0)
+        detectors = np.where(is_nircam, nircam_detectors, detectors).astype(object)
+        detectors[nircam_long] = [name.replace('5', 'LONG') for name in nircam_detectors[nircam_long].tolist()]
+
+        use_short = (is_nircam & ~nircam_long) | is_niriss
+        filternames = np.full(len(instruments), 'N/A', dtype=object)
+        pupilnames = np.full(len(instruments), 'N/A', dtype=object)
+        filternames[nircam_long] = np.asarray(self.info['LongFilter'], dtype=object)[nircam_long]
+        pupilnames[nircam_long] = np.asarray(self.info['LongPupil'], dtype=object)[nircam_long]
+        filternames[use_short] = np.asarray(self.info['ShortFilter'], dtype=object)[use_short]
+        pupilnames[use_short] = np.asarray(self.info['ShortPupil'], dtype=object)[use_short]
+
+        exptypes = np.select([is_nircam, is_niriss, is_fgs], ['NRC_IMAGE', 'NIS_IMAGE', 'FGS_IMAGE'],
+                             default='N/A').astype(object)
+
+        # Exposures from instruments other than NIRCam, NIRISS and FGS keep the
+        # filter, pupil, and exposure type of the closest preceding exposure
+        # from one of those instruments
+        supported = is_nircam | is_niriss | is_fgs
+        source_row = np.maximum.accumulate(np.where(supported, np.arange(len(instruments)), 0))
+        filternames = filternames[source_row]
+        pupilnames = pupilnames[source_row]
+        exptypes = exptypes[source_row]
+
+        readpatterns = np.asarray(self.info['ReadoutPattern'], dtype=object)
+        all_combinations = list(zip(instruments.tolist(), detectors.tolist(), filternames.tolist(),
+                                    pupilnames.tolist(), readpatterns.tolist(), exptypes.tolist()))
         unique_combinations = list(set(all_combinations))
         return all_combinations, unique_combinations
 
@@ -1237,10 +1352,8 @@ class SimInput:
         all_nonsidereal_instruments = inst[nonsidereal_index]
 
         # Get a list of the unique (target, instrument) combinations for
-        # non-sidereal observations
-        inst_targs = [[t, i] for t, i in zip(all_nonsidereal_targs, all_nonsidereal_instruments)]
-        ctr = Counter(tuple(x) for x in inst_targs)
-        unique = [list(key) for key in ctr.keys()]
+        # non-sidereal observations, in the order in which they first appear
+        unique = list(dict.fromkeys(zip(all_nonsidereal_targs.tolist(), all_nonsidereal_instruments.tolist())))
 
         # Check that all non-sidereal targets have catalogs associated with them
         #for targ, inst in zip(nonsidereal_targs, nonsidereal_instruments):
@@ -1262,7 +1375,15 @@ class SimInput:
 
             if 'ephemeris_file' in catalog_table.colnames:
                 ephemeris_file = catalog_table['ephemeris_file'][0]
-                ra_ephem, dec_ephem = ephemeris_tools.get_ephemeris(ephemeris_file)
+                radec_ephem = ephemeris_tools.get_ephemeris(ephemeris_file)
+            elif not pos_in_xy:
+                # Here we assume that the source (and aperture reference location)
+                # is located at the given RA, Dec at the start of the first exposure
+                # of each observation. This, and the source velocity, depend only on
+                # the catalog, so get them once for all observations of the target.
+                base_ra, base_dec = parse_RA_Dec(catalog_table['x_or_RA'].data[0], catalog_table['y_or_Dec'].data[0])
+                catalog_ra_vel = catalog_table['x_or_RA_velocity'].data[0]
+                catalog_dec_vel = catalog_table['y_or_Dec_velocity'].data[0]
 
             # Find the observations that use this target
             exp_index_this_target = targs == targ
@@ -1279,35 +1400,25 @@ class SimInput:
                 apertures = all_apertures[obs_exp_indexes]
                 unique_apertures = np.unique(apertures)
 
-                start_dates = []
-                for date_obs, time_obs in zip(obs_dates, obs_times):
-                    ob_time = '{}T{}'.format(date_obs, time_obs)
-                    try:
-                        start_dates.append(datetime.datetime.strptime(ob_time, '%Y-%m-%dT%H:%M:%S'))
-                    except ValueError:
-                        start_dates.append(datetime.datetime.strptime(ob_time, '%Y-%m-%dT%H:%M:%S.%f'))
+                # Parse all of the ISO-format date/time strings at once
+                ob_times = np.char.add(np.char.add(obs_dates.astype(str), 'T'), obs_times.astype(str))
+                start_datetimes = ob_times.astype('datetime64[us]')
+                start_dates = start_datetimes.astype(object).tolist()
 
                 if 'ephemeris_file' in catalog_table.colnames:
-                    all_times = [ephemeris_tools.to_timestamp(elem) for elem in start_dates]
+                    all_times = ephemeris_tools.datetimes_to_timestamps(start_datetimes)
 
                     # Create list of positions for all frames
                     try:
-                        ra_target = ra_ephem(all_times)
-                        dec_target = dec_ephem(all_times)
+                        ra_target, dec_target = radec_ephem(all_times)
 
                     except ValueError:
                         raise ValueError(("Observation dates ({} - {}) are not present within the ephemeris file {}"
                                           .format(start_dates[0], start_dates[-1], ephemeris_file)))
                 else:
                     if not pos_in_xy:
-                        # Here we assume that the source (and aperture reference location)
-                        # is located at the given RA, Dec at the start of the first exposure
-                        base_ra, base_dec = parse_RA_Dec(catalog_table['x_or_RA'].data[0], catalog_table['y_or_Dec'].data[0])
-                        ra_target = [base_ra]
-                        dec_target = [base_dec]
-
-                        ra_vel = catalog_table['x_or_RA_velocity'].data[0]
-                        dec_vel = catalog_table['y_or_Dec_velocity'].data[0]
+                        ra_vel = catalog_ra_vel
+                        dec_vel = catalog_dec_vel
 
                         # If the source velocity is given in units of pixels/hour, then we need
                         # to multiply this by the appropriate pixel scale.
@@ -1328,17 +1439,14 @@ class SimInput:
 
                             # In this case, there is a well-defined pixel scale, so we can translate
                             # velocities to units of arcsec/hour
-                            siaf = pysiaf.Siaf(inst)[unique_apertures[0]]
+                            siaf = siaf_interface.get_instance(inst)[unique_apertures[0]]
                             ra_vel *= siaf.XSciScale
                             dec_vel *= siaf.XSciScale
 
                         # Calculate RA, Dec for each exposure given the velocities
-                        for ob_date in start_dates[1:]:
-                            delta_time = ob_date - start_dates[0]
-                            delta_ra = ra_vel * delta_time.total_seconds() / 3600.
-                            delta_dec = dec_vel * delta_time.total_seconds() / 3600.
-                            ra_target.append(base_ra + delta_ra)
-                            dec_target.append(base_dec + delta_dec)
+                        delta_hours = (start_datetimes - start_datetimes[0]) / np.timedelta64(1, 'h')
+                        ra_target = base_ra + ra_vel * delta_hours
+                        dec_target = base_dec + dec_vel * delta_hours
 
                     else:
                         # Source location comes from the source catalog and is in units of pixels.
@@ -1368,8 +1476,8 @@ class SimInput:
 
         # Need to update these values (which come from the pointing file)
         # so that below we can adjust them for the different detectors/apertures
-        self.info['ra'] = [np.float64(ele) for ele in ra_from_pointing_file]
-        self.info['dec'] = [np.float64(ele) for ele in dec_from_pointing_file]
+        self.info['ra'] = np.asarray(ra_from_pointing_file, dtype=np.float64)
+        self.info['dec'] = np.asarray(dec_from_pointing_file, dtype=np.float64)
 
         # These go into the pointing in the yaml file
         self.info['ra_ref'] = ra_from_pointing_file
@@ -1447,40 +1555,8 @@ class SimInput:
         users, allow the input keys to be case insensitive. Take the user
         input dictionary and translate all the keys to be lower case.
         """
-        lower1 = {}
-        for key1, val1 in self.reffile_overrides.items():
-            if isinstance(val1, dict):
-                lower2 = {}
-                for key2, val2 in val1.items():
-                    if isinstance(val2, dict):
-                        lower3 = {}
-                        for key3, val3 in val2.items():
-                            if isinstance(val3, dict):
-                                lower4 = {}
-                                for key4, val4 in val3.items():
-                                    if isinstance(val4, dict):
-                                        lower5 = {}
-                                        for key5, val5 in val4.items():
-                                            if isinstance(val5, dict):
-                                                lower6 = {}
-                                                for key6, val6 in val5.items():
-                                                    lower6[key6.lower()] = val6
-                                                lower5[key5.lower()] = deepcopy(lower6)
-                                            else:
-                                                lower5[key5.lower()] = val5
-                                        lower4[key4.lower()] = deepcopy(lower5)
-                                    else:
-                                        lower4[key4.lower()] = val4
-                                lower3[key3.lower()] = deepcopy(lower4)
-                            else:
-                                lower3[key3.lower()] = val3
-                        lower2[key2.lower()] = deepcopy(lower3)
-                    else:
-                        lower2[key2.lower()] = val2
-                lower1[key1.lower()] = deepcopy(lower2)
-            else:
-                lower1[key1.lower()] = val1
-        self.reffile_overrides = lower1
+        self.reffile_overrides = _lowercase_keys(self.reffile_overrides)
+        self._lowercase_reffile_overrides = self.reffile_overrides
 
     def multiple_catalog_match(self, filter, cattype, matchlist):
         """
@@ -1518,21 +1594,17 @@ class SimInput:
 
     def path_defs(self):
         """Expand input files to have full paths"""
-        if self.input_xml is not None:
-            self.input_xml = os.path.abspath(os.path.expandvars(self.input_xml))
-        if self.pointing_file is not None:
-            self.pointing_file = os.path.abspath(os.path.expandvars(self.pointing_file))
-        self.output_dir = os.path.abspath(os.path.expandvars(self.output_dir))
-        self.simdata_output_dir = os.path.abspath(os.path.expandvars(self.simdata_output_dir))
-        if self.table_file is not None:
-            self.table_file = os.path.abspath(os.path.expandvars(self.table_file))
+        # The expanded paths depend on the current working directory and the
+        # environment variables, so they are not cached between calls
+        for attribute in ['input_xml', 'pointing_file', 'output_dir', 'simdata_output_dir', 'table_file',
+                          'observation_list_file']:
+            path = getattr(self, attribute)
+            if path is not None:
+                setattr(self, attribute, os.path.abspath(os.path.expandvars(path)))
 
         ensure_dir_exists(self.output_dir)
         ensure_dir_exists(self.simdata_output_dir)
 
-        if self.observation_list_file is not None:
-            self.observation_list_file = os.path.abspath(os.path.expandvars(self.observation_list_file))
-
     def reffile_setup(self):
         """Create lists of reference files associate with each detector.
 
@@ -1585,10 +1657,24 @@ class SimInput:
         self.det_list['nirspec'] = ['NRS']
         self.det_list['miri'] = ['MIR']
 
+        # Each dark directory is listed only once, even if it is searched
+        # with more than one pattern (e.g. for the two FGS detectors)
+        directory_listings = {}
+
+        def find_darks(directory, pattern):
+            if directory not in directory_listings:
+                directory_listings[directory] = _list_directory(directory)
+            return [os.path.join(directory, name) for name in fnmatch.filter(directory_listings[directory], pattern)]
+
         for instrument in 'nircam niriss fgs miri nirspec'.split():
             for list_name in list_names:
                 getattr(self, '{}_list'.format(list_name))[instrument] = {}
 
+            # Dark directories are only searched when the darks for a
+            # detector are first needed
+            self.dark_list[instrument] = utils.LazyDict()
+            self.lindark_list[instrument] = utils.LazyDict()
+
             if self.offline:
                 # no access to central store. Set all files to none.
                 for list_name in list_names:
@@ -1603,8 +1689,8 @@ class SimInput:
                 rawdark_dir = os.path.join(self.datadir, 'nircam/darks/raw')
                 lindark_dir = os.path.join(self.datadir, 'nircam/darks/linearized')
                 for det in self.det_list[instrument]:
-                    self.dark_list[instrument][det] = glob(os.path.join(rawdark_dir, det, '*.fits'))
-                    self.lindark_list[instrument][det] = glob(os.path.join(lindark_dir, det, '*.fits'))
+                    self.dark_list[instrument].loaders[det] = functools.partial(find_darks, os.path.join(rawdark_dir, det), '*.fits')
+                    self.lindark_list[instrument].loaders[det] = functools.partial(find_darks, os.path.join(lindark_dir, det), '*.fits')
 
             elif instrument in ['nirspec', 'miri']:
                 for key in 'subarray_def_file fluxcal filtpupil_pairs readpatt_def_file crosstalk ' \
@@ -1617,20 +1703,23 @@ class SimInput:
                         getattr(self, '{}_list'.format(list_name))[instrument][det] = default_value
 
             else:  # niriss and fgs
+                fgs_rawdark_dir = os.path.join(self.datadir, 'fgs/darks/raw')
+                fgs_lindark_dir = os.path.join(self.datadir, 'fgs/darks/linearized')
                 for det in self.det_list[instrument]:
                     if det == 'G1':
-                        self.dark_list[instrument][det] = glob(os.path.join(self.datadir, 'fgs/darks/raw', FGS1_DARK_SEARCH_STRING))
-                        self.lindark_list[instrument][det] = glob(os.path.join(self.datadir, 'fgs/darks/linearized', FGS1_DARK_SEARCH_STRING))
+                        self.dark_list[instrument].loaders[det] = functools.partial(find_darks, fgs_rawdark_dir, FGS1_DARK_SEARCH_STRING)
+                        self.lindark_list[instrument].loaders[det] = functools.partial(find_darks, fgs_lindark_dir, FGS1_DARK_SEARCH_STRING)
 
                     elif det == 'G2':
-                        self.dark_list[instrument][det] = glob(os.path.join(self.datadir, 'fgs/darks/raw', FGS2_DARK_SEARCH_STRING))
-                        self.lindark_list[instrument][det] = glob(os.path.join(self.datadir, 'fgs/darks/linearized', FGS2_DARK_SEARCH_STRING))
+                        self.dark_list[instrument].loaders[det] = functools.partial(find_darks, fgs_rawdark_dir, FGS2_DARK_SEARCH_STRING)
+                        self.lindark_list[instrument].loaders[det] = functools.partial(find_darks, fgs_lindark_dir, FGS2_DARK_SEARCH_STRING)
 
                     elif det == 'NIS':
-                        self.dark_list[instrument][det] = glob(os.path.join(self.datadir, 'niriss/darks/raw',
-                                                                            '*uncal.fits'))
-                        self.lindark_list[instrument][det] = glob(os.path.join(self.datadir, 'niriss/darks/linearized',
-                                                                               '*linear_dark_prep_object.fits'))
+                        self.dark_list[instrument].loaders[det] = functools.partial(
+                            find_darks, os.path.join(self.datadir, 'niriss/darks/raw'), '*uncal.fits')
+                        self.lindark_list[instrument].loaders[det] = functools.partial(
+                            find_darks, os.path.join(self.datadir, 'niriss/darks/linearized'),
+                            '*linear_dark_prep_object.fits')
 
     def set_config(self, file, prop):
         """
@@ -1650,11 +1739,9 @@ class SimInput:
         file : str
             Full path name to the input file
         """
-        if file.lower() not in ['config']:
-            file = os.path.abspath(file)
-        elif file.lower() == 'config':
-            file = os.path.join(self.modpath, 'config', self.configfiles[prop])
-        return file
+        if file.lower() == 'config':
+            return os.path.join(self.modpath, 'config', self.configfiles[prop])
+        return os.path.abspath(file)
 
     def get_psf_path(self):
         """ Create a list of the path to the PSF library directory for
@@ -1677,10 +1764,9 @@ class SimInput:
             The list of paths to the PSF library(ies), with a length
             equal to the number of activities in the APT program.
         """
-        exp_ids = sorted(list(set(self.info['entry_number'])))
-        exp_id_indices = []
-        for exp_id in self.info['entry_number']:
-            exp_id_indices.append(exp_ids.index(exp_id))
+        # Sorted unique entry numbers, and the index of each exposure's
+        # entry number within them
+        exp_ids, exp_id_indices = np.unique(np.asarray(self.info['entry_number']), return_inverse=True)
         n_activities = len(exp_ids)
 
         # If no path explicitly provided, use the default path.
@@ -1706,7 +1792,7 @@ class SimInput:
 
         elif isinstance(self.psf_paths, list):
             self.logger.info('Using provided PSF paths.')
-            paths_out = [self.psf_paths[i] for i in exp_id_indices]
+            paths_out = [self.psf_paths[i] for i in exp_id_indices.tolist()]
             return paths_out
 
         elif not isinstance(self.psf_paths, list) or not isinstance(self.psf_paths, str):
@@ -1741,8 +1827,10 @@ class SimInput:
 
         # Make all of the nested dictionaries such that they have case-
         # insensitive keys. This will allow the user to use upper or lower
-        # case for keys in their input dictionaries.
-        self.lowercase_dict_keys()
+        # case for keys in their input dictionaries. This only needs to be
+        # done once for a given dictionary.
+        if self.reffile_overrides is not self._lowercase_reffile_overrides:
+            self.lowercase_dict_keys()
 
         # CRDS uses NRCALONG rather than NRCA5.
         if 'long' in detector:
@@ -1752,106 +1840,20 @@ class SimInput:
         # really are.
         if instrument == 'niriss':
             if filtername.upper() in NIRISS_PUPIL_WHEEL_ELEMENTS:
-                temp = deepcopy(filtername)
-                filtername = deepcopy(pupilname)
-                pupilname = temp
+                filtername, pupilname = pupilname, filtername
                 if pupilname == 'clear':
                     pupilname = 'clearp'
 
-        # superbias
-        try:
-            if instrument in ['nircam', 'fgs']:
-                files['superbias'] = self.reffile_overrides[instrument]['superbias'][detector][readpattern]
-            elif instrument == 'niriss':
-                files['superbias'] = self.reffile_overrides[instrument]['superbias'][readpattern]
-        except KeyError:
-            files['superbias'] = 'none'
-
-        # linearity
-        try:
-            if instrument in ['nircam', 'fgs']:
-                files['linearity'] = self.reffile_overrides[instrument]['linearity'][detector]
-            elif instrument == 'niriss':
-                files['linearity'] = self.reffile_overrides[instrument]['linearity']
-        except KeyError:
-            files['linearity'] = 'none'
-
-        # saturation
-        try:
-            if instrument in ['nircam', 'fgs']:
-                files['saturation'] = self.reffile_overrides[instrument]['saturation'][detector]
-            elif instrument == 'niriss':
-                files['saturation'] = self.reffile_overrides[instrument]['saturation']
-        except KeyError:
-            files['saturation'] = 'none'
-
-        # gain
-        try:
-            if instrument in ['nircam', 'fgs']:
-                files['gain'] = self.reffile_overrides[instrument]['gain'][detector]
-            elif instrument == 'niriss':
-                files['gain'] = self.reffile_overrides[instrument]['gain']
-        except KeyError:
-            files['gain'] = 'none'
-
-        # distortion
-        try:
-            if instrument == 'nircam':
-                files['distortion'] = self.reffile_overrides[instrument]['distortion'][detector][filtername][exptype]
-            elif instrument == 'niriss':
-                files['distortion'] = self.reffile_overrides[instrument]['distortion'][pupilname][exptype]
-            elif instrument == 'fgs':
-                files['distortion'] = self.reffile_overrides[instrument]['distortion'][detector][exptype]
-        except KeyError:
-            files['distortion'] = 'none'
-
-        # ipc
-        try:
-            if instrument in ['nircam', 'fgs']:
-                files['ipc'] = self.reffile_overrides[instrument]['ipc'][detector]
-            elif instrument == 'niriss':
-                files['ipc'] = self.reffile_overrides[instrument]['ipc']
-        except KeyError:
-            files['ipc'] = 'none'
-
-        # transmission image
-        try:
-            if instrument == 'nircam':
-                files['transmission'] = self.reffile_overrides[instrument]['transmission'][detector][filtername][pupilname]
-            elif instrument == 'niriss':
-                files['transmission'] = self.reffile_overrides[instrument]['transmission'][filtername][pupilname]
-            elif instrument == 'fgs':
-                files['transmission'] = self.reffile_overrides[instrument]['transmission'][detector]
-        except KeyError:
-            files['transmission'] = 'none'
-
-        # bad pixel map
-        try:
-            if instrument == 'nircam':
-                files['badpixmask'] = self.reffile_overrides[instrument]['badpixmask'][detector]
-            elif instrument == 'niriss':
-                files['badpixmask'] = self.reffile_overrides[instrument]['badpixmask']
-            elif instrument == 'fgs':
-                files['badpixmask'] = self.reffile_overrides[instrument]['badpixmask'][detector][exptype]
-        except KeyError:
-            files['badpixmask'] = 'none'
-
-        # flat field file
-        try:
-            if instrument == 'nircam':
-                files['pixelflat'] = self.reffile_overrides[instrument]['pixelflat'][detector][filtername][pupilname]
-            elif instrument == 'niriss':
-                files['pixelflat'] = self.reffile_overrides[instrument]['pixelflat'][filtername][pupilname]
-            elif instrument == 'fgs':
-                files['pixelflat'] = self.reffile_overrides[instrument]['pixelflat'][detector][exptype]
-        except KeyError:
-            files['pixelflat'] = 'none'
-
-        # photom reference file
-        try:
-            files['photom'] = self.reffile_overrides[instrument]['photom'][detector]
-        except KeyError:
-            files['photom'] = 'none'
+        # Look up each type of reference file, using the keys that apply to
+        # this instrument. Types that are not in the dictionary are 'none'.
+        obs_keys = {'detector': detector, 'filtername': filtername, 'pupilname': pupilname,
+                    'readpattern': readpattern, 'exptype': exptype}
+        instrument_files = self.reffile_overrides.get(instrument, {})
+        for reftype, keys in REFFILE_OVERRIDE_KEYS.get(instrument, {'photom': ('detector',)}).items():
+            value = instrument_files.get(reftype, 'none') if isinstance(instrument_files, dict) else 'none'
+            for key in keys:
+                value = value.get(obs_keys[key], 'none') if isinstance(value, dict) else 'none'
+            files[reftype] = value
 
         return files
 
@@ -1869,10 +1871,7 @@ class SimInput:
         dict : dict
             Dictionary of observation information
         """
-        dict = {}
-        for colname in tab.colnames:
-            dict[colname] = tab[colname].data
-        return dict
+        return {colname: tab[colname].data for colname in tab.colnames}
 
     def write_yaml(self, input):
         """
@@ -1885,11 +1884,12 @@ class SimInput:
             information for one exposure
         """
         instrument = input['Instrument']
+        instrument_lower = instrument.lower()
+        detector = input['detector']
+        aperture = input['aperture']
         # select the right filter
-        if input['detector'] in ['NIS']:
-            # if input['APTTemplate'] == 'NirissExternalCalibration': 'NirissImaging':
-            filtkey = 'FilterWheel'
-            pupilkey = 'PupilWheel'
+        filtkey, pupilkey, catkey = _wheel_keys(detector)
+        if detector == 'NIS':
             # set the FilterWheel and PupilWheel for NIRISS
             if input['APTTemplate'] in ['NirissAmi']:
                 filter_name = input['Filter']
@@ -1917,279 +1917,271 @@ class SimInput:
                     input[filtkey] = filter_name
                 else:
                     raise RuntimeError('Filter {} not valid'.format(filter_name))
-            catkey = ''
-        elif input['detector'] in ['FGS']:
-            filtkey = 'FilterWheel'
-            pupilkey = 'PupilWheel'
-            catkey = ''
-        elif input['detector'] in ['NRS', 'MIR']:
-            filtkey = 'FilterWheel'
-            pupilkey = 'PupilWheel'
-            catkey = ''
-        else:
-            if int(input['detector'][-1]) < 5:
-                filtkey = 'ShortFilter'
-                pupilkey = 'ShortPupil'
-                catkey = 'sw'
-            else:
-                filtkey = 'LongFilter'
-                pupilkey = 'LongPupil'
-                catkey = 'lw'
 
         outfile = input['outputfits']
         yamlout = input['yamlfile']
 
-        yamlout = os.path.join(self.output_dir, yamlout)
-        with open(yamlout, 'w') as f:
-            f.write('Inst:\n')
-            f.write('  instrument: {}          # Instrument name\n'.format(instrument))
-            f.write('  mode: {}                # Observation mode (e.g. imaging, WFSS)\n'.format(input['Mode']))
-            f.write('  use_JWST_pipeline: {}   # Use pipeline in data transformations\n'.format(input['use_JWST_pipeline']))
-            f.write('\n')
-            f.write('Readout:\n')
-            f.write('  readpatt: {}        # Readout pattern (RAPID, BRIGHT2, etc) overrides nframe, nskip unless it is not recognized\n'.format(input['ReadoutPattern']))
-            f.write('  ngroup: {}              # Number of groups in integration\n'.format(input['Groups']))
-            f.write('  nint: {}          # Number of integrations per exposure\n'.format(input['Integrations']))
-            f.write('  namp: {}          # Number of amplifiers used to read out detector\n'.format(input['namp']))
-            f.write('  resets_bet_ints: {} #Number of detector resets between integrations\n'.format(self.resets_bet_ints))
-
-            if instrument.lower() == 'nircam':
-                # if input['aperture'] in ['NRCA3_DHSPIL', 'NRCB4_DHSPIL']:
-                if 'NRCA3_DHSPIL' in input['aperture'] or 'NRCB4_DHSPIL' in input['aperture']: # in ['NRCA3_DHSPIL', 'NRCB4_DHSPIL']:
-                    full_ap = input['aperture']
-                else:
-                    apunder = input['aperture'].find('_')
-                    full_ap = 'NRC' + input['detector'] + '_' + input['aperture'][apunder + 1:]
-            if instrument.lower() in ['niriss', 'fgs']:
-                full_ap = input['aperture']
+        # Seeds are normally drawn for all files by create_inputs
+        if 'cosmic_ray_seed' in input:
+            cosmic_ray_seed = input['cosmic_ray_seed']
+            poisson_seed = input['poisson_seed']
+        else:
+            cosmic_ray_seed, poisson_seed = np.random.randint(1, 2**32-2, size=2).tolist()
 
-            possible_apertures = pysiaf.Siaf(instrument).apernames
-            if full_ap not in possible_apertures:
+        yamlout = os.path.join(self.output_dir, yamlout)
+        # Build the contents of the file, and write it with a single call
+        lines = []
+        lines.append('Inst:\n')
+        lines.append('  instrument: {}          # Instrument name\n'.format(instrument))
+        lines.append('  mode: {}                # Observation mode (e.g. imaging, WFSS)\n'.format(input['Mode']))
+        lines.append('  use_JWST_pipeline: {}   # Use pipeline in data transformations\n'.format(input['use_JWST_pipeline']))
+        lines.append(('\n'
+                      'Readout:\n'))
+        lines.append('  readpatt: {}        # Readout pattern (RAPID, BRIGHT2, etc) overrides nframe, nskip unless it is not recognized\n'.format(input['ReadoutPattern']))
+        lines.append('  ngroup: {}              # Number of groups in integration\n'.format(input['Groups']))
+        lines.append('  nint: {}          # Number of integrations per exposure\n'.format(input['Integrations']))
+        lines.append('  namp: {}          # Number of amplifiers used to read out detector\n'.format(input['namp']))
+        lines.append('  resets_bet_ints: {} #Number of detector resets between integrations\n'.format(self.resets_bet_ints))
+
+        if instrument_lower == 'nircam':
+            # if input['aperture'] in ['NRCA3_DHSPIL', 'NRCB4_DHSPIL']:
+            if 'NRCA3_DHSPIL' in aperture or 'NRCB4_DHSPIL' in aperture: # in ['NRCA3_DHSPIL', 'NRCB4_DHSPIL']:
+                full_ap = aperture
+            else:
+                full_ap = 'NRC{}_{}'.format(detector, aperture.split('_', 1)[-1])
+        if instrument_lower in ['niriss', 'fgs']:
+            full_ap = aperture
+
+        # Most exposures share a few apertures, so only check each one against
+        # the (cached) SIAF once
+        if full_ap not in self._validated_apertures:
+            if full_ap not in siaf_interface.get_instance(instrument).apernames:
                 raise ValueError('Unrecognized aperture name: {}'.format(full_ap))
+            self._validated_apertures.add(full_ap)
+
+        lines.append('  array_name: {}    # Name of array (FULL, SUB160, SUB64P, etc)\n'.format(full_ap))
+        lines.append('  intermediate_aperture: {}   # Name of intermediate aperture used in NIRCam Grism time series obs.\n'.format(input['grismts_intermediate_aperture']))
+        lines.append('  PPS_aperture: {}  # Original aperture value supplied by PPS.\n'.format(input['pps_aperture']))
+        lines.append('  filter: {}       # Filter of simulated data (F090W, F322W2, etc)\n'.format(input[filtkey]))
+        lines.append('  pupil: {}        # Pupil element for simulated data (CLEAR, GRISMC, etc)\n'.format(input[pupilkey]))
+        lines.append(('\n'
+                      'Reffiles:                                 # Set to None or leave blank if you wish to skip that step\n'))
+        lines.append('  dark: {}   # Dark current integration used as the base\n'.format(input['dark']))
+        lines.append('  linearized_darkfile: {}   # Linearized dark ramp to use as input. Supercedes dark above\n'.format(input['lindark']))
+        lines.append('  badpixmask: {}   # If linearized dark is used, populate output DQ extensions using this file\n'.format(input['badpixmask']))
+        lines.append('  superbias: {}     # Superbias file. Set to None or leave blank if not using\n'.format(input['superbias']))
+        lines.append('  linearity: {}    # linearity correction coefficients\n'.format(input['linearity']))
+        lines.append('  saturation: {}    # well depth reference files\n'.format(input['saturation']))
+        lines.append('  gain: {} # Gain map\n'.format(input['gain']))
+        lines.append('  pixelflat: {}    # Flat field file to use for un-flattening output\n'.format(input['pixelflat']))
+        lines.append('  illumflat: None                               # Illumination flat field file\n')
+        lines.append('  astrometric: {}  # Astrometric distortion file (asdf)\n'.format(input['astrometric']))
+        lines.append('  photom: {}   # cal pipeline photom reference file\n'.format(input['photom']))
+        lines.append('  ipc: {} # File containing IPC kernel to apply\n'.format(input['ipc']))
+        lines.append(('  invertIPC: {}      # Invert the IPC kernel before the convolution. True or False. Use True if the kernel is '
+                      'designed for the removal of IPC effects, like the JWST reference files are.\n'.format(input['invert_ipc'])))
+        lines.append('  occult: None                                    # Occulting spots correction image\n')
+        lines.append(('  transmission: {}      # Transmission image containing fractional throughput map. (e.g. to imprint occulters into fov\n'
+                      .format(input['transmission'])))
+        lines.append(('  subarray_defs: {} # File that contains a list of all possible subarray names and coordinates\n'
+                      .format(input['subarray_def_file'])))
+        lines.append(('  readpattdefs: {}  # File that contains a list of all possible readout pattern names and associated '
+                      'NFRAME/NSKIP values\n'.format(input['readpatt_def_file'])))
+        lines.append('  crosstalk: {}   # File containing crosstalk coefficients\n'.format(input['crosstalk_file']))
+        lines.append(('  filtpupilcombo: {}   # File that lists the filter wheel element / pupil wheel element combinations. '
+                      'Used only in writing output file\n'.format(input['filtpupilcombo_file'])))
+        lines.append(('  filter_wheel_positions: {}  # File containing resolver wheel positions for each filter/pupil\n'.format(input['filter_position_file'])))
+        lines.append(('  flux_cal: {} # File that lists flux conversion factor and pivot wavelength for each filter. Only '
+                      'used when making direct image outputs to be fed into the grism disperser code.\n'.format(input['flux_cal_file'] )))
+        lines.append('  filter_throughput: {} #File containing filter throughput curve\n'.format(self.configfiles[instrument_lower]['filter_throughput']))
+        lines.append(('  '
+                      '\n'
+                      'nonlin:\n'
+                      '  limit: 60000.0                           # Upper singal limit to which nonlinearity is applied (ADU)\n'
+                      '  accuracy: 0.000001                        # Non-linearity accuracy threshold\n'
+                      '  maxiter: 10                              # Maximum number of iterations to use when applying non-linearity\n'
+                      '  robberto:  False                         # Use Massimo Robberto type non-linearity coefficients\n'
+                      '\n'
+                      'cosmicRay:\n'))
+        cosmic_ray_path = os.path.join(self.datadir, instrument_lower, 'cosmic_ray_library')
+        lines.append('  path: {}               # Path to CR library\n'.format(cosmic_ray_path))
+        lines.append('  library: {}    # Type of cosmic rayenvironment (SUNMAX, SUNMIN, FLARE)\n'.format(input['CosmicRayLibrary']))
+        lines.append('  scale: {}     # Cosmic ray scaling factor\n'.format(input['CosmicRayScale']))
+        # temporary tweak here to make it work with NIRISS
+        detector_label = detector
+
+        if instrument_lower in ['nircam', 'wfsc']:
+            # detector_label = input['detector']
+            lines.append('  suffix: IPC_NIRCam_{}    # Suffix of library file names\n'.format(
+                     detector_label))
+        elif instrument_lower == 'niriss':
+            lines.append('  suffix: IPC_NIRISS_{}    # Suffix of library file names\n'.format(
+                     detector_label))
+        elif instrument_lower == 'fgs':
+            detector_string = FGS_GUIDER_NAMES[detector_label]
+            lines.append('  suffix: IPC_FGS_{}    # Suffix of library file names\n'.format(
+                     detector_string))
+        lines.append('  seed: {}                 # Seed for random number generator\n'.format(cosmic_ray_seed))
+        lines.append(('\n'
+                      'simSignals:\n'))
+        if instrument_lower in ['nircam', 'wfsc']:
+            PointSourceCatalog = input['{}_ptsrc'.format(catkey)]
+            GalaxyCatalog = input['{}_galcat'.format(catkey)]
+            ExtendedCatalog = input['{}_ext'.format(catkey)]
+            ExtendedScale = input['{}_extscl'.format(catkey)]
+            ExtendedCenter = input['{}_extcent'.format(catkey)]
+            MovingTargetList = input['{}_movptsrc'.format(catkey)]
+            MovingTargetSersic = input['{}_movgal'.format(catkey)]
+            MovingTargetExtended = input['{}_movext'.format(catkey)]
+            MovingTargetConvolveExtended = input['{}_movconv'.format(catkey)]
+            MovingTargetToTrack = input['{}_solarsys'.format(catkey)]
+            ImagingTSOCatalog = input['{}_img_tso'.format(catkey)]
+            GrismTSOCatalog = input['{}_grism_tso'.format(catkey)]
+            BackgroundRate = input['{}_bkgd'.format(catkey)]
+        elif instrument_lower in ['niriss', 'fgs']:
+            PointSourceCatalog = input['PointSourceCatalog']
+            GalaxyCatalog = input['GalaxyCatalog']
+            ExtendedCatalog = input['ExtendedCatalog']
+            ExtendedScale = input['ExtendedScale']
+            ExtendedCenter = input['ExtendedCenter']
+            MovingTargetList = input['MovingTargetList']
+            MovingTargetSersic = input['MovingTargetSersic']
+            MovingTargetExtended = input['MovingTargetExtended']
+            MovingTargetConvolveExtended = input['MovingTargetConvolveExtended']
+            MovingTargetToTrack = input['MovingTargetToTrack']
+            ImagingTSOCatalog = input['ImagingTSOCatalog']
+            GrismTSOCatalog = input['GrismTSOCatalog']
+            BackgroundRate = input['BackgroundRate']
+
+        lines.append(('  pointsource: {}   #File containing a list of point sources to add (x, y locations and magnitudes)\n'
+                      .format(PointSourceCatalog)))
+        lines.append('  gridded_psf_library_row_padding: 4  # Number of outer rows and columns to avoid when evaluating library. RECOMMEND 4.\n')
+        lines.append('  psf_wing_threshold_file: {}   # File defining PSF sizes versus magnitude\n'.format(input['psf_wing_threshold_file']))
+        lines.append('  add_psf_wings: {}  # Whether or not to place the core of the psf from the gridded library into an image of the wings before adding.\n'.format(self.add_psf_wings))
+        lines.append('  psfpath: {}   #Path to PSF library\n'.format(input['psfpath']))
+        lines.append('  psfwfe: {}   #PSF WFE value (predicted or requirements)\n'.format(self.psfwfe))
+        lines.append('  psfwfegroup: {}      #WFE realization group (0 to 4)\n'.format(self.psfwfegroup))
+        lines.append(('  galaxyListFile: {}    #File containing a list of positions/ellipticities/magnitudes of galaxies '
+                      'to simulate\n'.format(GalaxyCatalog)))
+        lines.append('  extended: {}          #Extended emission count rate image file name\n'.format(ExtendedCatalog))
+        lines.append('  extendedscale: {}                          #Scaling factor for extended emission image\n'.format(ExtendedScale))
+        lines.append(('  extendedCenter: {}                   #x, y pixel location at which to place the extended image '
+                      'if it is smaller than the output array size\n'.format(ExtendedCenter)))
+        lines.append(('  PSFConvolveExtended: {} #Convolve the extended image with the PSF before adding to the output '
+                      'image (True or False)\n'.format(self.convolve_extended)))
+        lines.append(('  movingTargetList: {}          #Name of file containing a list of point source moving targets (e.g. '
+                      'KBOs, asteroids) to add.\n'.format(MovingTargetList)))
+        lines.append(('  movingTargetSersic: {}  #ascii file containing a list of 2D sersic profiles to have moving through '
+                      'the field\n'.format(MovingTargetSersic)))
+        lines.append(('  movingTargetExtended: {}      #ascii file containing a list of stamp images to add as moving targets '
+                      '(planets, moons, etc)\n'.format(MovingTargetExtended)))
+        lines.append(('  movingTargetToTrack: {} #File containing a single moving target which JWST will track during '
+                      'observation (e.g. a planet, moon, KBO, asteroid)	This file will only be used if mode is set to '
+                      '"moving_target" \n'.format(MovingTargetToTrack)))
+        lines.append(('  tso_imaging_catalog: {} #Catalog of (generally one) source for Imaging Time Series observation\n'.format(ImagingTSOCatalog)))
+        lines.append(('  tso_grism_catalog: {} #Catalog of (generally one) source for Grism Time Series observation\n'.format(GrismTSOCatalog)))
+        lines.append(('  zodiacal:  None                          #Zodiacal light count rate image file \n'
+                      '  zodiscale:  1.0                            #Zodi scaling factor\n'
+                      '  scattered:  None                          #Scattered light count rate image file\n'
+                      '  scatteredscale: 1.0                        #Scattered light scaling factor\n'))
+        lines.append(('  bkgdrate: {}                         #Constant background count rate (ADU/sec/pixel in an undispersed image) or '
+                      '"high","medium","low" similar to what is used in the ETC\n'.format(BackgroundRate)))
+        lines.append(('  poissonseed: {}                  #Random number generator seed for Poisson simulation)\n'
+                      .format(poisson_seed)))
+        lines.append(('  photonyield: True                         #Apply photon yield in simulation\n'
+                      '  pymethod: True                            #Use double Poisson simulation for photon yield\n'))
+        lines.append('  expand_catalog_for_segments: {}                     # Expand catalog for 18 segments and use distinct PSFs\n'
+                     .format(self.expand_catalog_for_segments))
+        lines.append('  use_dateobs_for_background: {}          # Use date_obs below to deternine background. If False, bkgdrate is used.\n'
+                     .format(self.dateobs_for_background))
+        lines.append('  signal_low_limit_for_segmap: {}         # Lower signal limit to include pix in segmentation map. See below for units.\n'
+                     .format(self.segmentation_threshold))
+        lines.append(('  signal_low_limit_for_segmap_units: {}  # Units of signal_low_limit_for_segmap. Can be: [ADU/sec, e/sec, MJy/sr, '
+                      'ergs/cm2/a, ergs/cm2/hz]\n'.format(self.segmentation_threshold_units)))
+        lines.append('  add_ghosts: {}  # Add optical ghosts associated with astronomical sources\n'.format(self.add_ghosts))
+        lines.append('  PSFConvolveGhosts: {}  # Convolve ghost stamp images with instrument PSF before adding\n'.format(self.convolve_ghosts))
+        lines.append(('\n'
+                      'Telescope:\n'))
+        lines.append('  ra: {}                      # RA of simulated pointing\n'.format(input['ra_ref']))
+        lines.append('  dec: {}                    # Dec of simulated pointing\n'.format(input['dec_ref']))
+        if 'pav3' in input.keys():
+            pav3_value = input['pav3']
+        else:
+            pav3_value = input['PAV3']
+        lines.append('  rotation: {}                    # PA_V3 in degrees, i.e. the position angle of the V3 axis at V1 (V2=0, V3=0) measured from N to E.\n'.format(pav3_value))
+        lines.append('  tracking: {}   #Telescope tracking. Can be sidereal or non-sidereal\n'.format(input['Tracking']))
+        lines.append(('\n'
+                      'Output:\n'))
+        # lines.append('  use_stsci_output_name: {} # Output filename should follow STScI naming conventions (True/False)\n'.format(outtf))
+        lines.append('  directory: {}  # Output directory\n'.format(self.simdata_output_dir))
+        lines.append('  file: {}   # Output filename\n'.format(outfile))
+        lines.append(("  datatype: {} # Type of data to save. 'linear' for linearized ramp. 'raw' for raw ramp. 'linear, "
+                      "raw' for both\n".format(self.datatype)))
+        lines.append(('  format: DMS          # Output file format Options: DMS, SSR(not yet implemented)\n'
+                      '  save_intermediates: False   # Save intermediate products separately (point source image, etc)\n'))
+        lines.append('  grism_source_image: {}   # grism\n'.format(input['grism_source_image']))
+        lines.append(('  unsigned: True   # Output unsigned integers? (0-65535 if true. -32768 to 32768 if false)\n'
+                      '  dmsOrient: True    # Output in DMS orientation (vs. fitswriter orientation).\n'))
+        lines.append('  program_number: {}    # Program Number\n'.format(input['ProposalID']))
+        lines.append('  title: {}   # Program title\n'.format(input['Title'].replace(':', ', ')))
+        lines.append('  PI_Name: {}  # Proposal PI Name\n'.format(input['PI_Name']))
+        lines.append('  Proposal_category: {}  # Proposal category\n'.format(input['Proposal_category']))
+        lines.append('  Science_category: {}  # Science category\n'.format(input['Science_category']))
+        lines.append('  target_name: {}  # Name of target\n'.format(input['TargetID']))
+
+        # For now, skip populating the target RA and Dec in WFSC data.
+        # The read_xxxxx funtions for these observation types will have
+        # to be updated to make use of the proposal_parameter_dictionary
+        if isinstance(input['TargetRA'], (int, float, np.integer, np.floating)):
+            input['TargetRA'] = str(input['TargetRA'])
+            input['TargetDec'] = str(input['TargetDec'])
+        if input['TargetRA'] != '0':
+            ra_degrees, dec_degrees = _target_ra_dec_degrees(input['TargetRA'], input['TargetDec'])
+        else:
+            ra_degrees = 0.
+            dec_degrees = 0.
+
+        lines.append('  target_ra: {}  # RA of the target, from APT file.\n'.format(ra_degrees))
+        lines.append('  target_dec: {}  # Dec of the target, from APT file.\n'.format(dec_degrees))
+        lines.append("  observation_number: '{}'    # Observation Number\n".format(input['obs_num']))
+        lines.append('  observation_label: {}    # User-generated observation Label\n'.format(input['obs_label'].strip()))
+        lines.append("  visit_number: '{}'    # Visit Number\n".format(input['visit_num']))
+        lines.append("  visit_group: '{}'    # Visit Group\n".format(input['visit_group']))
+        lines.append("  visit_id: '{}'    # Visit ID\n".format(input['visit_id']))
+        lines.append("  sequence_id: '{}'    # Sequence ID\n".format(input['sequence_id']))
+        lines.append("  activity_id: '{}'    # Activity ID. Increment with each exposure.\n".format(input['act_id']))
+        lines.append("  exposure_number: '{}'    # Exposure Number\n".format(input['exposure']))
+        lines.append("  obs_id: '{}'   # Observation ID number\n".format(input['observation_id']))
+        lines.append("  date_obs: '{}'  # Date of observation\n".format(input['date_obs']))
+        lines.append("  time_obs: '{}'  # Time of observation\n".format(input['time_obs']))
+        # lines.append("  obs_template: '{}'  # Observation template\n".format(input['obs_template']))
+        lines.append("  primary_dither_type: {}  # Primary dither pattern name\n".format(input['PrimaryDitherType']))
+        lines.append("  total_primary_dither_positions: {}  # Total number of primary dither positions\n".format(input['PrimaryDithers']))
+        lines.append("  primary_dither_position: {}  # Primary dither position number\n".format(int(input['primary_dither_num'])))
+        lines.append("  subpix_dither_type: {}  # Subpixel dither pattern name\n".format(input['SubpixelDitherType']))
+        # For WFSS we need to strip out the '-Points' from
+        # the number of subpixel positions entry
+        dash = -1
+        if isinstance(input['SubpixelPositions'], str):
+            dash = input['SubpixelPositions'].find('-')
+        if (dash == -1):
+            val = input['SubpixelPositions']
+        else:
+            val = input['SubpixelPositions'][0:dash]
+        if val == 'None':
+            val = 1
+        # try:
+        #     dash = input['SubpixelPositions'].find('-')
+        #     val = input['SubpixelPositions'][0:dash]
+        # except:
+        #     val = input['SubpixelPositions']
+        lines.append("  total_subpix_dither_positions: {}  # Total number of subpixel dither positions\n".format(val))
+        lines.append("  subpix_dither_position: {}  # Subpixel dither position number\n".format(int(input['subpix_dither_num'])))
+        lines.append("  xoffset: {}  # Dither pointing offset in x (arcsec)\n".format(input['idlx']))
+        lines.append("  yoffset: {}  # Dither pointing offset in y (arcsec)\n".format(input['idly']))
 
-            f.write('  array_name: {}    # Name of array (FULL, SUB160, SUB64P, etc)\n'.format(full_ap))
-            f.write('  intermediate_aperture: {}   # Name of intermediate aperture used in NIRCam Grism time series obs.\n'.format(input['grismts_intermediate_aperture']))
-            f.write('  PPS_aperture: {}  # Original aperture value supplied by PPS.\n'.format(input['pps_aperture']))
-            f.write('  filter: {}       # Filter of simulated data (F090W, F322W2, etc)\n'.format(input[filtkey]))
-            f.write('  pupil: {}        # Pupil element for simulated data (CLEAR, GRISMC, etc)\n'.format(input[pupilkey]))
-            f.write('\n')
-            f.write('Reffiles:                                 # Set to None or leave blank if you wish to skip that step\n')
-            f.write('  dark: {}   # Dark current integration used as the base\n'.format(input['dark']))
-            f.write('  linearized_darkfile: {}   # Linearized dark ramp to use as input. Supercedes dark above\n'.format(input['lindark']))
-            f.write('  badpixmask: {}   # If linearized dark is used, populate output DQ extensions using this file\n'.format(input['badpixmask']))
-            f.write('  superbias: {}     # Superbias file. Set to None or leave blank if not using\n'.format(input['superbias']))
-            f.write('  linearity: {}    # linearity correction coefficients\n'.format(input['linearity']))
-            f.write('  saturation: {}    # well depth reference files\n'.format(input['saturation']))
-            f.write('  gain: {} # Gain map\n'.format(input['gain']))
-            f.write('  pixelflat: {}    # Flat field file to use for un-flattening output\n'.format(input['pixelflat']))
-            f.write('  illumflat: None                               # Illumination flat field file\n')
-            f.write('  astrometric: {}  # Astrometric distortion file (asdf)\n'.format(input['astrometric']))
-            f.write('  photom: {}   # cal pipeline photom reference file\n'.format(input['photom']))
-            f.write('  ipc: {} # File containing IPC kernel to apply\n'.format(input['ipc']))
-            f.write(('  invertIPC: {}      # Invert the IPC kernel before the convolution. True or False. Use True if the kernel is '
-                     'designed for the removal of IPC effects, like the JWST reference files are.\n'.format(input['invert_ipc'])))
-            f.write('  occult: None                                    # Occulting spots correction image\n')
-            f.write(('  transmission: {}      # Transmission image containing fractional throughput map. (e.g. to imprint occulters into fov\n'
-                     .format(input['transmission'])))
-            f.write(('  subarray_defs: {} # File that contains a list of all possible subarray names and coordinates\n'
-                     .format(input['subarray_def_file'])))
-            f.write(('  readpattdefs: {}  # File that contains a list of all possible readout pattern names and associated '
-                     'NFRAME/NSKIP values\n'.format(input['readpatt_def_file'])))
-            f.write('  crosstalk: {}   # File containing crosstalk coefficients\n'.format(input['crosstalk_file']))
-            f.write(('  filtpupilcombo: {}   # File that lists the filter wheel element / pupil wheel element combinations. '
-                     'Used only in writing output file\n'.format(input['filtpupilcombo_file'])))
-            f.write(('  filter_wheel_positions: {}  # File containing resolver wheel positions for each filter/pupil\n'.format(input['filter_position_file'])))
-            f.write(('  flux_cal: {} # File that lists flux conversion factor and pivot wavelength for each filter. Only '
-                     'used when making direct image outputs to be fed into the grism disperser code.\n'.format(input['flux_cal_file'] )))
-            f.write('  filter_throughput: {} #File containing filter throughput curve\n'.format(self.configfiles[instrument.lower()]['filter_throughput']))
-            f.write('  ')
-            f.write('\n')
-            f.write('nonlin:\n')
-            f.write('  limit: 60000.0                           # Upper singal limit to which nonlinearity is applied (ADU)\n')
-            f.write('  accuracy: 0.000001                        # Non-linearity accuracy threshold\n')
-            f.write('  maxiter: 10                              # Maximum number of iterations to use when applying non-linearity\n')
-            f.write('  robberto:  False                         # Use Massimo Robberto type non-linearity coefficients\n')
-            f.write('\n')
-            f.write('cosmicRay:\n')
-            cosmic_ray_path = os.path.join(self.datadir, instrument.lower(), 'cosmic_ray_library')
-            f.write('  path: {}               # Path to CR library\n'.format(cosmic_ray_path))
-            f.write('  library: {}    # Type of cosmic rayenvironment (SUNMAX, SUNMIN, FLARE)\n'.format(input['CosmicRayLibrary']))
-            f.write('  scale: {}     # Cosmic ray scaling factor\n'.format(input['CosmicRayScale']))
-            # temporary tweak here to make it work with NIRISS
-            detector_label = input['detector']
-
-            if instrument.lower() in ['nircam', 'wfsc']:
-                # detector_label = input['detector']
-                f.write('  suffix: IPC_NIRCam_{}    # Suffix of library file names\n'.format(
-                    detector_label))
-            elif instrument.lower() == 'niriss':
-                f.write('  suffix: IPC_NIRISS_{}    # Suffix of library file names\n'.format(
-                    detector_label))
-            elif instrument.lower() == 'fgs':
-                if detector_label == 'G1':
-                    detector_string = 'GUIDER1'
-                elif detector_label == 'G2':
-                    detector_string = 'GUIDER2'
-                f.write('  suffix: IPC_FGS_{}    # Suffix of library file names\n'.format(
-                    detector_string))
-            f.write('  seed: {}                 # Seed for random number generator\n'.format(np.random.randint(1, 2**32-2)))
-            f.write('\n')
-            f.write('simSignals:\n')
-            if instrument.lower() in ['nircam', 'wfsc']:
-                PointSourceCatalog = input['{}_ptsrc'.format(catkey)]
-                GalaxyCatalog = input['{}_galcat'.format(catkey)]
-                ExtendedCatalog = input['{}_ext'.format(catkey)]
-                ExtendedScale = input['{}_extscl'.format(catkey)]
-                ExtendedCenter = input['{}_extcent'.format(catkey)]
-                MovingTargetList = input['{}_movptsrc'.format(catkey)]
-                MovingTargetSersic = input['{}_movgal'.format(catkey)]
-                MovingTargetExtended = input['{}_movext'.format(catkey)]
-                MovingTargetConvolveExtended = input['{}_movconv'.format(catkey)]
-                MovingTargetToTrack = input['{}_solarsys'.format(catkey)]
-                ImagingTSOCatalog = input['{}_img_tso'.format(catkey)]
-                GrismTSOCatalog = input['{}_grism_tso'.format(catkey)]
-                BackgroundRate = input['{}_bkgd'.format(catkey)]
-            elif instrument.lower() in ['niriss', 'fgs']:
-                PointSourceCatalog = input['PointSourceCatalog']
-                GalaxyCatalog = input['GalaxyCatalog']
-                ExtendedCatalog = input['ExtendedCatalog']
-                ExtendedScale = input['ExtendedScale']
-                ExtendedCenter = input['ExtendedCenter']
-                MovingTargetList = input['MovingTargetList']
-                MovingTargetSersic = input['MovingTargetSersic']
-                MovingTargetExtended = input['MovingTargetExtended']
-                MovingTargetConvolveExtended = input['MovingTargetConvolveExtended']
-                MovingTargetToTrack = input['MovingTargetToTrack']
-                ImagingTSOCatalog = input['ImagingTSOCatalog']
-                GrismTSOCatalog = input['GrismTSOCatalog']
-                BackgroundRate = input['BackgroundRate']
-
-            f.write(('  pointsource: {}   #File containing a list of point sources to add (x, y locations and magnitudes)\n'
-                     .format(PointSourceCatalog)))
-            f.write('  gridded_psf_library_row_padding: 4  # Number of outer rows and columns to avoid when evaluating library. RECOMMEND 4.\n')
-            f.write('  psf_wing_threshold_file: {}   # File defining PSF sizes versus magnitude\n'.format(input['psf_wing_threshold_file']))
-            f.write('  add_psf_wings: {}  # Whether or not to place the core of the psf from the gridded library into an image of the wings before adding.\n'.format(self.add_psf_wings))
-            f.write('  psfpath: {}   #Path to PSF library\n'.format(input['psfpath']))
-            f.write('  psfwfe: {}   #PSF WFE value (predicted or requirements)\n'.format(self.psfwfe))
-            f.write('  psfwfegroup: {}      #WFE realization group (0 to 4)\n'.format(self.psfwfegroup))
-            f.write(('  galaxyListFile: {}    #File containing a list of positions/ellipticities/magnitudes of galaxies '
-                     'to simulate\n'.format(GalaxyCatalog)))
-            f.write('  extended: {}          #Extended emission count rate image file name\n'.format(ExtendedCatalog))
-            f.write('  extendedscale: {}                          #Scaling factor for extended emission image\n'.format(ExtendedScale))
-            f.write(('  extendedCenter: {}                   #x, y pixel location at which to place the extended image '
-                     'if it is smaller than the output array size\n'.format(ExtendedCenter)))
-            f.write(('  PSFConvolveExtended: {} #Convolve the extended image with the PSF before adding to the output '
-                     'image (True or False)\n'.format(self.convolve_extended)))
-            f.write(('  movingTargetList: {}          #Name of file containing a list of point source moving targets (e.g. '
-                     'KBOs, asteroids) to add.\n'.format(MovingTargetList)))
-            f.write(('  movingTargetSersic: {}  #ascii file containing a list of 2D sersic profiles to have moving through '
-                     'the field\n'.format(MovingTargetSersic)))
-            f.write(('  movingTargetExtended: {}      #ascii file containing a list of stamp images to add as moving targets '
-                     '(planets, moons, etc)\n'.format(MovingTargetExtended)))
-            f.write(('  movingTargetToTrack: {} #File containing a single moving target which JWST will track during '
-                     'observation (e.g. a planet, moon, KBO, asteroid)	This file will only be used if mode is set to '
-                     '"moving_target" \n'.format(MovingTargetToTrack)))
-            f.write(('  tso_imaging_catalog: {} #Catalog of (generally one) source for Imaging Time Series observation\n'.format(ImagingTSOCatalog)))
-            f.write(('  tso_grism_catalog: {} #Catalog of (generally one) source for Grism Time Series observation\n'.format(GrismTSOCatalog)))
-            f.write('  zodiacal:  None                          #Zodiacal light count rate image file \n')
-            f.write('  zodiscale:  1.0                            #Zodi scaling factor\n')
-            f.write('  scattered:  None                          #Scattered light count rate image file\n')
-            f.write('  scatteredscale: 1.0                        #Scattered light scaling factor\n')
-            f.write(('  bkgdrate: {}                         #Constant background count rate (ADU/sec/pixel in an undispersed image) or '
-                     '"high","medium","low" similar to what is used in the ETC\n'.format(BackgroundRate)))
-            f.write(('  poissonseed: {}                  #Random number generator seed for Poisson simulation)\n'
-                     .format(np.random.randint(1, 2**32-2))))
-            f.write('  photonyield: True                         #Apply photon yield in simulation\n')
-            f.write('  pymethod: True                            #Use double Poisson simulation for photon yield\n')
-            f.write('  expand_catalog_for_segments: {}                     # Expand catalog for 18 segments and use distinct PSFs\n'
-                    .format(self.expand_catalog_for_segments))
-            f.write('  use_dateobs_for_background: {}          # Use date_obs below to deternine background. If False, bkgdrate is used.\n'
-                    .format(self.dateobs_for_background))
-            f.write('  signal_low_limit_for_segmap: {}         # Lower signal limit to include pix in segmentation map. See below for units.\n'
-                    .format(self.segmentation_threshold))
-            f.write(('  signal_low_limit_for_segmap_units: {}  # Units of signal_low_limit_for_segmap. Can be: [ADU/sec, e/sec, MJy/sr, '
-                     'ergs/cm2/a, ergs/cm2/hz]\n'.format(self.segmentation_threshold_units)))
-            f.write('  add_ghosts: {}  # Add optical ghosts associated with astronomical sources\n'.format(self.add_ghosts))
-            f.write('  PSFConvolveGhosts: {}  # Convolve ghost stamp images with instrument PSF before adding\n'.format(self.convolve_ghosts))
-            f.write('\n')
-            f.write('Telescope:\n')
-            f.write('  ra: {}                      # RA of simulated pointing\n'.format(input['ra_ref']))
-            f.write('  dec: {}                    # Dec of simulated pointing\n'.format(input['dec_ref']))
-            if 'pav3' in input.keys():
-                pav3_value = input['pav3']
-            else:
-                pav3_value = input['PAV3']
-            f.write('  rotation: {}                    # PA_V3 in degrees, i.e. the position angle of the V3 axis at V1 (V2=0, V3=0) measured from N to E.\n'.format(pav3_value))
-            f.write('  tracking: {}   #Telescope tracking. Can be sidereal or non-sidereal\n'.format(input['Tracking']))
-            f.write('\n')
-            f.write('Output:\n')
-            # f.write('  use_stsci_output_name: {} # Output filename should follow STScI naming conventions (True/False)\n'.format(outtf))
-            f.write('  directory: {}  # Output directory\n'.format(self.simdata_output_dir))
-            f.write('  file: {}   # Output filename\n'.format(outfile))
-            f.write(("  datatype: {} # Type of data to save. 'linear' for linearized ramp. 'raw' for raw ramp. 'linear, "
-                     "raw' for both\n".format(self.datatype)))
-            f.write('  format: DMS          # Output file format Options: DMS, SSR(not yet implemented)\n')
-            f.write('  save_intermediates: False   # Save intermediate products separately (point source image, etc)\n')
-            f.write('  grism_source_image: {}   # grism\n'.format(input['grism_source_image']))
-            f.write('  unsigned: True   # Output unsigned integers? (0-65535 if true. -32768 to 32768 if false)\n')
-            f.write('  dmsOrient: True    # Output in DMS orientation (vs. fitswriter orientation).\n')
-            f.write('  program_number: {}    # Program Number\n'.format(input['ProposalID']))
-            f.write('  title: {}   # Program title\n'.format(input['Title'].replace(':', ', ')))
-            f.write('  PI_Name: {}  # Proposal PI Name\n'.format(input['PI_Name']))
-            f.write('  Proposal_category: {}  # Proposal category\n'.format(input['Proposal_category']))
-            f.write('  Science_category: {}  # Science category\n'.format(input['Science_category']))
-            f.write('  target_name: {}  # Name of target\n'.format(input['TargetID']))
-
-            # For now, skip populating the target RA and Dec in WFSC data.
-            # The read_xxxxx funtions for these observation types will have
-            # to be updated to make use of the proposal_parameter_dictionary
-            if np.isreal(input['TargetRA']):
-                input['TargetRA'] = str(input['TargetRA'])
-                input['TargetDec'] = str(input['TargetDec'])
-            if input['TargetRA'] != '0':
-                ra_degrees, dec_degrees = utils.parse_RA_Dec(input['TargetRA'], input['TargetDec'])
-            else:
-                ra_degrees = 0.
-                dec_degrees = 0.
-
-            f.write('  target_ra: {}  # RA of the target, from APT file.\n'.format(ra_degrees))
-            f.write('  target_dec: {}  # Dec of the target, from APT file.\n'.format(dec_degrees))
-            f.write("  observation_number: '{}'    # Observation Number\n".format(input['obs_num']))
-            f.write('  observation_label: {}    # User-generated observation Label\n'.format(input['obs_label'].strip()))
-            f.write("  visit_number: '{}'    # Visit Number\n".format(input['visit_num']))
-            f.write("  visit_group: '{}'    # Visit Group\n".format(input['visit_group']))
-            f.write("  visit_id: '{}'    # Visit ID\n".format(input['visit_id']))
-            f.write("  sequence_id: '{}'    # Sequence ID\n".format(input['sequence_id']))
-            f.write("  activity_id: '{}'    # Activity ID. Increment with each exposure.\n".format(input['act_id']))
-            f.write("  exposure_number: '{}'    # Exposure Number\n".format(input['exposure']))
-            f.write("  obs_id: '{}'   # Observation ID number\n".format(input['observation_id']))
-            f.write("  date_obs: '{}'  # Date of observation\n".format(input['date_obs']))
-            f.write("  time_obs: '{}'  # Time of observation\n".format(input['time_obs']))
-            # f.write("  obs_template: '{}'  # Observation template\n".format(input['obs_template']))
-            f.write("  primary_dither_type: {}  # Primary dither pattern name\n".format(input['PrimaryDitherType']))
-            f.write("  total_primary_dither_positions: {}  # Total number of primary dither positions\n".format(input['PrimaryDithers']))
-            f.write("  primary_dither_position: {}  # Primary dither position number\n".format(int(input['primary_dither_num'])))
-            f.write("  subpix_dither_type: {}  # Subpixel dither pattern name\n".format(input['SubpixelDitherType']))
-            # For WFSS we need to strip out the '-Points' from
-            # the number of subpixel positions entry
-            dash = -1
-            if isinstance(input['SubpixelPositions'], str):
-                dash = input['SubpixelPositions'].find('-')
-            if (dash == -1):
-                val = input['SubpixelPositions']
-            else:
-                val = input['SubpixelPositions'][0:dash]
-            if val == 'None':
-                val = 1
-            # try:
-            #     dash = input['SubpixelPositions'].find('-')
-            #     val = input['SubpixelPositions'][0:dash]
-            # except:
-            #     val = input['SubpixelPositions']
-            f.write("  total_subpix_dither_positions: {}  # Total number of subpixel dither positions\n".format(val))
-            f.write("  subpix_dither_position: {}  # Subpixel dither position number\n".format(int(input['subpix_dither_num'])))
-            f.write("  xoffset: {}  # Dither pointing offset in x (arcsec)\n".format(input['idlx']))
-            f.write("  yoffset: {}  # Dither pointing offset in y (arcsec)\n".format(input['idly']))
+        with open(yamlout, 'w') as f:
+            f.write(''.join(lines))
 
         return yamlout
 
@@ -2228,6 +2220,299 @@ class SimInput:
         return parser
 
 
+def _write_csv_columns(columns, filename):
+    """Write a dictionary of equal-length columns to a csv file one row at
+    a time, without first building an astropy Table from the columns.
+    If any column contains values other than scalars, the columns are
+    written via an astropy Table instead.
+
+    Parameters
+    ----------
+    columns : dict
+        Dictionary of column name: list of values
+
+    filename : str
+        Name of the csv file to write
+    """
+    keys = list(columns)
+    scalar_types = (str, int, float, np.generic, type(None))
+    if not all(isinstance(value, scalar_types) for key in keys for value in columns[key]):
+        Table(columns).write(filename, format='csv', overwrite=True)
+        return
+
+    # None is written as 'None', as it is by astropy, rather than as an empty field
+    rows = zip(*(columns[key] for key in keys))
+    with open(filename, 'w', newline='') as file_obj:
+        writer = csv.writer(file_obj, lineterminator='\n')
+        writer.writerow(keys)
+        writer.writerows(['None' if value is None else value for value in row] for row in rows)
+
+
+def _lowercase_keys(dictionary):
+    """Return a copy of a nested dictionary in which all string keys,
+    at every level of nesting, are lowercase. Values other than
+    dictionaries are not copied.
+
+    Parameters
+    ----------
+    dictionary : dict
+        Nested dictionary
+
+    Returns
+    -------
+    lowered : dict
+        Copy of ``dictionary`` with lowercase keys
+    """
+    return {(key.lower() if isinstance(key, str) else key):
+            (_lowercase_keys(value) if isinstance(value, dict) else value)
+            for key, value in dictionary.items()}
+
+
+def _list_directory(directory):
+    """List the names of the non-hidden entries in a directory, as they
+    would be matched by ``glob``.
+
+    Parameters
+    ----------
+    directory : str
+        Name of the directory
+
+    Returns
+    -------
+    names : list
+        Names of the entries in the directory. Empty if the directory
+        does not exist.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.name for entry in entries if not entry.name.startswith('.')]
+    except OSError:
+        return []
+
+
+@functools.lru_cache(maxsize=16)
+def _read_definition_table(filename):
+    """Read a readout pattern or subarray definition file. The results are
+    cached, as the same few files are read each time the paths are set up.
+    Format guessing is kept, because the definition files do not all share
+    the same header style. Callers should copy the returned table before
+    modifying it.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the ascii file
+
+    Returns
+    -------
+    table : astropy.table.Table
+        Table read from the file
+    """
+    return ascii.read(filename)
+
+
+@functools.lru_cache(maxsize=None)
+def _wheel_keys(detector):
+    """Get the names of the input table columns holding the filter and
+    pupil values for a detector, along with the prefix of its catalog
+    columns
+
+    Parameters
+    ----------
+    detector : str
+        Detector name, e.g. 'A1', 'B5', 'NIS'
+
+    Returns
+    -------
+    keys : tuple
+        (filter column, pupil column, catalog prefix)
+    """
+    if detector in WHEEL_DETECTOR_KEYS:
+        return WHEEL_DETECTOR_KEYS[detector]
+    # Remaining detectors end in a number. For NIRCam, 1-4 are shortwave
+    # and 5 is longwave
+    if int(detector[-1]) < 5:
+        return 'ShortFilter', 'ShortPupil', 'sw'
+    return 'LongFilter', 'LongPupil', 'lw'
+
+
+@functools.lru_cache(maxsize=None)
+def _target_ra_dec_degrees(ra_string, dec_string):
+    """Convert a target's RA and Dec strings to decimal degrees. The
+    results are cached, since every exposure of a target writes the
+    same values into its yaml file.
+
+    Parameters
+    ----------
+    ra_string : str
+        Target RA, e.g. '10:12:13.2' or '10h12m13.2s'
+
+    dec_string : str
+        Target Dec, e.g. '10:12:2.4' or '10d12m2.4s'
+
+    Returns
+    -------
+    ra_degrees : float
+        Right Ascension in degrees
+
+    dec_degrees : float
+        Declination in degrees
+    """
+    return parse_RA_Dec(ra_string, dec_string)
+
+
+def _number_of_subpixel_positions(positions):
+    """Get the number of subpixel dither positions from the value in the
+    SubpixelPositions column of the observation table
+
+    Parameters
+    ----------
+    positions : str or int
+        Value from the SubpixelPositions column. e.g. 'NONE', 4, '4', or
+        a string beginning with the number of positions
+
+    Returns
+    -------
+    num_positions : int
+        Number of subpixel dither positions
+    """
+    if isinstance(positions, str) and positions.upper() == 'NONE':
+        return 1
+    try:
+        return int(positions)
+    except (ValueError, TypeError):
+        return int(positions[0])
+
+
+def _substrings(strings, start, stop):
+    """Extract characters ``start`` to ``stop`` from each string in a list,
+    equivalent to ``[string[start:stop] for string in strings]``. The strings
+    are viewed as a 2D array of characters, so that the substrings are
+    extracted with a single slice rather than one slice per string.
+
+    Parameters
+    ----------
+    strings : list
+        List of strings
+
+    start : int
+        Index of the first character to extract
+
+    stop : int
+        Index after the last character to extract
+
+    Returns
+    -------
+    substrings : numpy.ndarray
+        Array of substrings
+    """
+    strings = np.asarray(strings, dtype=str)
+    width = max(strings.dtype.itemsize // np.dtype('U1').itemsize, stop)
+    chars = strings.astype('U{}'.format(width)).view('U1').reshape(len(strings), width)
+    return np.ascontiguousarray(chars[:, start:stop]).view('U{}'.format(stop - start)).ravel()
+
+
+def _cached_get_observation_dict(xml_file, pointing_file, yaml_file, catalogs, output_dir, verbose=False,
+                                 parameter_overrides=None):
+    """Wrapper around ``get_observation_dict`` that, if the MIRAGE_YAML_CACHE
+    environment variable is set to 1, saves the results in a pickle file
+    in ``output_dir/.mirage_cache``. Subsequent calls with the same (unmodified)
+    APT files, catalogs, parameter overrides and Mirage version load the pickle
+    file rather than parsing the APT files again, as long as the observation
+    list file still has the contents it had when the pickle file was written.
+
+    Parameters
+    ----------
+    xml_file : str
+        Path to APT .xml file
+
+    pointing_file : str
+        Path to APT .pointing file. Used only in the cache key.
+
+    yaml_file : str
+        Name of the observation list file written by ``get_observation_dict``
+
+    catalogs : dict
+        Dictionary of catalog files. See ``get_observation_dict``
+
+    output_dir : str
+        Directory in which the cache directory is created
+
+    verbose : bool
+        Passed to ``get_observation_dict``
+
+    parameter_overrides : dict
+        Dictionary of default parameter values, e.g. date, roll angle
+
+    Returns
+    -------
+    xml_dict : dict
+        Expanded dictionary that holds exposure information
+
+    skipped_obs_numbers : list
+        List of observation numbers with unsupported observation templates.
+    """
+    if os.environ.get(CACHE_ENV_VAR) != '1':
+        return get_observation_dict(xml_file, yaml_file, catalogs, verbose=verbose,
+                                    parameter_overrides=parameter_overrides)
+
+    logger = logging.getLogger('mirage.yaml.yaml_generator._cached_get_observation_dict')
+
+    # The key changes if either APT file is modified, if the other inputs change,
+    # or if a different version of Mirage (which may parse the files differently) is used
+    file_stats = []
+    for filename in [xml_file, pointing_file]:
+        if filename is not None and os.path.isfile(filename):
+            file_info = os.stat(filename)
+            file_stats.append((os.path.abspath(filename), file_info.st_mtime_ns, file_info.st_size))
+        else:
+            file_stats.append(None)
+    key_data = repr(file_stats) + json.dumps([catalogs, parameter_overrides, os.path.abspath(yaml_file),
+                                              mirage.__version__], sort_keys=True, default=str)
+    key = hashlib.blake2b(key_data.encode(), digest_size=16).hexdigest()
+
+    cache_dir = os.path.join(output_dir, '.mirage_cache')
+    cache_file = os.path.join(cache_dir, '{}.pkl'.format(key))
+
+    # The observation list file is used later, so only use the cache if it is
+    # still present and has not been changed since the cache file was written
+    if os.path.isfile(cache_file) and os.path.isfile(yaml_file):
+        with open(cache_file, 'rb') as file_obj:
+            results, observation_list_digest = pickle.load(file_obj)
+        if observation_list_digest == _file_digest(yaml_file):
+            logger.info('Loading observation information from cache file: {}'.format(cache_file))
+            return results
+
+    results = get_observation_dict(xml_file, yaml_file, catalogs, verbose=verbose,
+                                   parameter_overrides=parameter_overrides)
+
+    # Write to a temporary file and then rename, so that an interrupted write
+    # never leaves a partial cache file behind
+    ensure_dir_exists(cache_dir)
+    tmp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    with open(tmp_file, 'wb') as file_obj:
+        pickle.dump((results, _file_digest(yaml_file)), file_obj, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    return results
+
+
+def _file_digest(filename):
+    """Calculate a hash of the contents of a file
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file
+
+    Returns
+    -------
+    digest : str
+        Hexadecimal digest of the file contents
+    """
+    with open(filename, 'rb') as file_obj:
+        return hashlib.blake2b(file_obj.read(), digest_size=16).hexdigest()
+
+
 def _gtvt_v3pa_on_date(ra, dec, date=None, return_range=False):
     """Call JWST GTVT to retrieve nominal observatory position angle (V3 PA) for given coordinates and date
 
@@ -2253,6 +2538,7 @@ def _gtvt_v3pa_on_date(ra, dec, date=None, return_range=False):
     pa_v3 : float
         V3PA in degrees
     """
+    from astropy.time import Time, TimeDelta
     from jwst_gtvt.jwst_tvt import Ephemeris
 
     if date is None:
@@ -2287,6 +2573,60 @@ def _gtvt_v3pa_on_date(ra, dec, date=None, return_range=False):
     return nominal_pa
 
 
+@functools.lru_cache(maxsize=256)
+def _cached_v3pa_on_date(ra, dec, date):
+    """Find the nominal V3PA of a pointing on a given date using
+    ``_gtvt_v3pa_on_date``. Results are cached, so that observations
+    sharing a pointing, and repeated calls, only query the GTVT once.
+
+    Parameters
+    ----------
+    ra : float
+        RA in decimal degrees
+
+    dec : float
+        Dec in decimal degrees
+
+    date : str
+        Date of observation, in YYYY-MM-DD format
+
+    Returns
+    -------
+    pa_v3 : float
+        V3PA in degrees
+    """
+    return _gtvt_v3pa_on_date(ra, dec, date=date)
+
+
+def _read_pointing_info(pointing_filename):
+    """Read an APT pointing file for the V3PA functions. The contents are
+    cached, and only read again if the file is modified. The returned
+    dictionary is shared between calls, and should not be modified.
+
+    Parameters
+    ----------
+    pointing_filename : str
+        Pointing file filename exported by APT
+
+    Returns
+    -------
+    pointing_table : dict
+        Dictionary of info read from the pointing file
+    """
+    # Key the cache on the resolved path, so that different spellings of
+    # the same file share an entry
+    pointing_filename = os.path.realpath(pointing_filename)
+    return _cached_pointing_info(pointing_filename, os.path.getmtime(pointing_filename))
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_pointing_info(pointing_filename, mtime):
+    """Read the pointing file for ``_read_pointing_info``. ``mtime`` is only
+    used as part of the cache key.
+    """
+    return apt_inputs.AptInput().get_pointing_info(pointing_filename, 0)
+
+
 def default_obs_v3pa_on_date(pointing_filename, obs_num, date=None, verbose=False, pointing_table=None):
     """Find the nominal/default V3PA for an observation on a given date.
 
@@ -2312,7 +2652,7 @@ def default_obs_v3pa_on_date(pointing_filename, obs_num, date=None, verbose=Fals
     """
 
     if pointing_table is None:
-        pointing_table = apt_inputs.AptInput().get_pointing_info(pointing_filename, 0)
+        pointing_table = _read_pointing_info(pointing_filename)
     for i in range(len(pointing_table['obs_num'])):
         if pointing_table['obs_num'][i] == f"{obs_num:03d}":
             ra_deg, dec_deg = pointing_table['ra'][i], pointing_table['dec'][i]
@@ -2323,7 +2663,11 @@ def default_obs_v3pa_on_date(pointing_filename, obs_num, date=None, verbose=Fals
     else:
         raise RuntimeError(f"Could not find any info for an observation number {obs_num} in the pointing table.")
 
-    result = _gtvt_v3pa_on_date(ra_deg, dec_deg, date=date)
+    # Resolve the default date here, so that cached values are not reused
+    # on a later day
+    if date is None:
+        date = datetime.date.today().isoformat()
+    result = _cached_v3pa_on_date(ra_deg, dec_deg, date)
     if np.isnan(result):
         raise RuntimeError("Obs {obs_num} is not observable on date {date}. Target not in the field of regard.")
     return result
@@ -2346,12 +2690,20 @@ def all_obs_v3pa_on_date(pointing_filename, date=None, verbose=False):
         Dict of V3PAs, in the format for passing to the `roll_angle` argument to mirage.yaml_generator()
 
     """
-    results = {}
-    pointing_table = apt_inputs.AptInput().get_pointing_info(pointing_filename, 0)
-    obsnums = sorted(list(set(pointing_table['obs_num'])))
-    for obs_num in obsnums:
-        results[obs_num] = default_obs_v3pa_on_date(pointing_filename, int(obs_num), date=date, verbose=verbose,
-                                                    pointing_table=pointing_table)
+    pointing_table = _read_pointing_info(pointing_filename)
+    obsnums = np.unique(pointing_table['obs_num']).tolist()
+
+    # The observations are independent, and most of the time for each one is
+    # spent waiting on the ephemeris query, so run them concurrently
+    obs_v3pa = functools.partial(default_obs_v3pa_on_date, pointing_filename, date=date, verbose=verbose,
+                                 pointing_table=pointing_table)
+    if len(obsnums) < 2:
+        # Many programs contain a single observation, which needs no thread pool
+        return {obs_num: obs_v3pa(int(obs_num)) for obs_num in obsnums}
+
+    num_threads = min(MAX_GTVT_QUERY_THREADS, len(obsnums))
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        results = dict(zip(obsnums, executor.map(obs_v3pa, [int(obs_num) for obs_num in obsnums])))
     return results
 
 
@@ -2366,17 +2718,20 @@ def yaml_from_params(input, yamlout=None):
         The full path of the new file
     """
     # Values to put in quotes in the YAML file
-    add_quotes = ['date_obs', 'time_obs']
+    add_quotes = frozenset(['date_obs', 'time_obs'])
 
     # Filename
     yamlout = yamlout or os.path.join(input['Output']['directory'], 'paramfile.yaml')
 
-    # Write all the data
+    # Build the contents of the file, and write it with a single call
+    lines = []
+    for section, info in input.items():
+        lines.append(f"\n{section}:\n")
+        for k, v in info.items():
+            lines.append(f"  {k}: '{v}'\n" if k in add_quotes else f"  {k}: {v}\n")
+
     with open(yamlout, 'w') as f:
-        for section, info in input.items():
-            f.write("\n{}:\n".format(section))
-            for k, v in info.items():
-                f.write("  {}: '{}'\n".format(k, v)) if k in add_quotes else f.write("  {}: {}\n".format(k, v))
+        f.write(''.join(lines))
 
     return yamlout
 
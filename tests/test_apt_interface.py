@@ -21,7 +21,9 @@ from astropy.io import ascii
 import numpy as np
 
 from mirage.yaml import generate_observationlist, yaml_generator
+from mirage.apt import apt_inputs
 from mirage.apt.read_apt_xml import ReadAPTXML
+from mirage.utils import siaf_interface
 from mirage.utils.utils import ensure_dir_exists
 
 TEST_DATA_DIR = os.path.join(os.path.dirname(__file__), 'test_data')
@@ -165,6 +167,31 @@ def test_complete_input_generation(temporary_directory):
                     assert len(obs_yfiles_niriss) == expected_niriss_files[prog][i-1]
 
 
+def test_ra_dec_update_leaves_siaf_unchanged():
+    """The SIAF instances passed to ra_dec_update are shared through the
+    get_instance cache, so the SW grism time series apertures must not be
+    modified when their pointing is set to the LW intermediate aperture.
+    """
+    nircam_siaf = siaf_interface.get_instance('nircam')
+    sw_aperture = nircam_siaf['NRCA1_GRISMTS64']
+    original_v2, original_v3 = sw_aperture.V2Ref, sw_aperture.V3Ref
+    intermediate = nircam_siaf['NRCA5_TAGRISMTS_SCI_F444W']
+
+    exposure_dict = {'Module': ['A', 'A'], 'Instrument': ['NIRCAM', 'NIRCAM'],
+                     'aperture': ['NRCA5_GRISM64_F444W', 'NRCA1_GRISMTS64'],
+                     'ra': [80.4, 80.4], 'dec': [-69.8, -69.8],
+                     'v2': [intermediate.V2Ref] * 2, 'v3': [intermediate.V3Ref] * 2,
+                     'pav3': [10., 10.]}
+    exposure_dict = apt_inputs.ra_dec_update(exposure_dict, {'NIRCAM': nircam_siaf})
+
+    assert sw_aperture.V2Ref == original_v2
+    assert sw_aperture.V3Ref == original_v3
+
+    # The SW aperture reference location is the pointing itself
+    assert np.isclose(exposure_dict['ra_ref'][1], 80.4)
+    assert np.isclose(exposure_dict['dec_ref'][1], -69.8)
+
+
 def read_xml(xml_file):
     """Read in and parse xml file from APT
 
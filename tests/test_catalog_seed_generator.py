@@ -242,3 +242,108 @@ def test_overlap_coordinates_subarray():
                                                     updated_psf_dimensions, stamp_x_loc, stamp_y_loc,
                                                     coord_sys='aperture')
         assert (i1, i2, j1, j2, k1, k2, l1, l2) == expected_k1l1[index]
+
+
+def test_moving_target_ephemeris_non_sidereal_tracking(tmp_path, monkeypatch):
+    """Background source positions from an ephemeris file, in an exposure
+    tracking a non-sidereal target. The background source here follows the
+    same ephemeris as the tracked target, so it should stay at a fixed
+    detector location.
+    """
+    from mirage.seed_image import ephemeris_tools
+    import pysiaf
+
+    ephemeris_file = os.path.join(os.path.dirname(__file__), 'test_data/ephemeris/horizons_results.txt')
+    catalog_file = str(tmp_path / 'ephemeris_sources.cat')
+    with open(catalog_file, 'w') as fobj:
+        fobj.write('# abmag\n')
+        fobj.write('index x_or_RA y_or_Dec ephemeris_file nircam_f200w_clear_magnitude\n')
+        fobj.write('1 23.74433 6.01483 {} 17.\n'.format(ephemeris_file))
+
+    seed = catalog_seed_image.Catalog_seed(offline=True)
+    seed.params = {'Inst': {'instrument': 'nircam'},
+                   'Readout': {'nint': 1, 'ngroup': 2, 'nframe': 1, 'nskip': 0, 'resets_bet_ints': 1,
+                               'filter': 'F200W', 'pupil': 'CLEAR'},
+                   'Output': {'date_obs': '2020-10-03', 'time_obs': '00:00:00'}}
+    seed.frametime = 3600.
+    seed.nominal_dims = [2048, 2048]
+    seed.output_dims = [2048, 2048]
+    seed.siaf = pysiaf.Siaf('nircam')['NRCB1_FULL']
+    seed.photfnu = None
+    seed.photflam = None
+    seed.vegazeropoint = None
+
+    # Simple linear mapping between RA, Dec and detector x, y
+    ra0, dec0, scale = 23.7, 6.0, 0.031 / 3600.
+
+    def get_positions(input_x, input_y, pixel_flag, max_source_distance):
+        if pixel_flag:
+            x, y = float(input_x), float(input_y)
+            ra, dec = ra0 + (x - 1024.) * scale, dec0 + (y - 1024.) * scale
+        else:
+            ra, dec = float(input_x), float(input_y)
+            x, y = 1024. + (ra - ra0) / scale, 1024. + (dec - dec0) / scale
+        return x, y, ra, dec, '', ''
+
+    # Record the positions where PSFs would be placed, and skip the stamp creation
+    stamp_x = []
+
+    def create_psf_stamp(x, y, dim_x, dim_y, ignore_detector=False):
+        stamp_x.append(x)
+        return None, 0, 0, 0, 0, False
+
+    monkeypatch.setattr(seed, 'get_positions', get_positions)
+    monkeypatch.setattr(seed, 'remove_outside_fov_sources', lambda index, source, pixflag, delta: (index, source))
+    monkeypatch.setattr(seed, 'find_psf_size', lambda rate: 51)
+    monkeypatch.setattr(seed, 'create_psf_stamp', create_psf_stamp)
+    monkeypatch.setattr(catalog_seed_image.utils, 'magnitude_to_countrate', lambda *args, **kwargs: 1000.)
+
+    ra_interp, dec_interp = ephemeris_tools.get_ephemeris(ephemeris_file)
+    seed.movingTargetInputs(catalog_file, 'point_source', MT_tracking=True,
+                            non_sidereal_ra_interp_function=ra_interp,
+                            non_sidereal_dec_interp_function=dec_interp, add_ghosts=False)
+
+    assert len(stamp_x) > 0
+    assert np.allclose(stamp_x, stamp_x[0])
+
+
+def test_intermediate_aperture_attitude():
+    """The cached attitude matrix for the intermediate aperture should match
+    the one from get_siaf_information, and should be read-only
+    """
+    from mirage.utils import siaf_interface
+
+    nircam_siaf = siaf_interface.get_instance('nircam')
+    aperture = nircam_siaf['NRCA5_TAGRISMTS_SCI_F444W']
+    local_roll, attitude_matrix, _, _ = siaf_interface.get_siaf_information(nircam_siaf, aperture.AperName,
+                                                                            80.4, -69.8, 10.)
+    cached_roll, cached_matrix = catalog_seed_image._intermediate_aperture_attitude(aperture.V2Ref, aperture.V3Ref,
+                                                                                    80.4, -69.8, 10.)
+    assert np.isclose(cached_roll, local_roll)
+    assert np.allclose(cached_matrix, attitude_matrix)
+    assert not cached_matrix.flags.writeable
+
+
+def test_set_segmentation_threshold(tmp_path):
+    """Segmentation map thresholds given in e/s and MJy/sr should be
+    converted to ADU/sec
+    """
+    from astropy.io import fits
+
+    photom_file = str(tmp_path / 'photom.fits')
+    photom = Table({'filter': ['F200W', 'F150W'], 'pupil': ['CLEAR', 'CLEAR'], 'photmjsr': [0.25, 0.5]})
+    fits.HDUList([fits.PrimaryHDU(), fits.BinTableHDU(photom)]).writeto(photom_file)
+
+    seed = catalog_seed_image.Catalog_seed(offline=True)
+    seed.gain_value = 2.
+    seed.photflam = None
+    seed.photfnu = None
+    seed.params = {'Reffiles': {'photom': photom_file},
+                   'Readout': {'filter': 'F200W', 'pupil': 'CLEAR'},
+                   'simSignals': {'signal_low_limit_for_segmap': 10.}}
+
+    expected = {'ADU/s': 10., 'e/s': 5., 'MJy/sr': 40.}
+    for units, threshold in expected.items():
+        seed.params['simSignals']['signal_low_limit_for_segmap_units'] = units
+        seed.set_segmentation_threshold()
+        assert np.isclose(seed.segmentation_threshold, threshold)
@@ -39,7 +39,7 @@ def test_create_interpol_function():
     assert np.isclose(dec_interp[0], 6.01483333, atol=1e-9)
 
 def test_read_ephemeris_file():
-    """Read in an ephemeris and return interpolation funcations. Development
+    """Read in an ephemeris and return arrays of times and positions. Development
     was based on an ephemeris file from Hoirzons.
     """
     files = ['horizons_results.txt', 'horizons_results_jupiter.txt']
@@ -49,13 +49,47 @@ def test_read_ephemeris_file():
 
     for efile, time, ra, dec in zip(files, times, ras, decs):
         ephemeris_file = os.path.join(data_dir, efile)
-        ephem = ephemeris_tools.read_ephemeris_file(ephemeris_file)
+        ephem_times, ephem_ra, ephem_dec = ephemeris_tools.read_ephemeris_file(ephemeris_file)
 
-        check_time = datetime.datetime(2020, 10, 1)
-        match = ephem['Time'] == time
+        match = ephem_times == ephemeris_tools.to_timestamp(time)
 
-        assert np.isclose(ephem[match]['RA'].data[0], ra, atol=1e-9)
-        assert np.isclose(ephem[match]['Dec'].data[0], dec, atol=1e-9)
-        cols = ['Time', 'RA', 'Dec']
-        for col in cols:
-            assert col in ephem.colnames
+        assert np.isclose(ephem_ra[match][0], ra, atol=1e-9)
+        assert np.isclose(ephem_dec[match][0], dec, atol=1e-9)
+        for column in [ephem_times, ephem_ra, ephem_dec]:
+            assert column.dtype == np.float64
+
+
+def test_calculate_nested_positions_pixels():
+    """Calculate sub-frame positions for a source whose locations are given
+    in units of pixels
+    """
+    x_frames = np.array([10., 10.1, 10.5, 11.5])
+    y_frames = np.array([20., 20., 20., 20.])
+    times = np.array([0., 10., 20., 30.])
+    x_nested, y_nested, times_nested = ephemeris_tools.calculate_nested_positions(x_frames, y_frames, times, 0.3,
+                                                                                  position_units='pixels')
+
+    assert [len(entry) for entry in times_nested] == [1, 2, 4]
+    assert np.allclose(times_nested[0], [10.])
+    assert np.allclose(times_nested[1], [10., 20.])
+    assert np.allclose(times_nested[2], [20., 23.33333333, 26.66666667, 30.])
+    assert np.allclose(x_nested[2], [10.5, 10.83333333, 11.16666667, 11.5])
+    assert np.allclose(y_nested[2], 20.)
+
+
+def test_ephemeris_from_catalog_angular():
+    """Create an ephemeris from the RA, Dec and velocities listed in a
+    catalog, and check the positions one hour after the start time
+    """
+    from astropy.table import Table
+
+    catalog = Table({'x_or_RA': [10.], 'y_or_Dec': [20.], 'x_or_RA_velocity': [36.],
+                     'y_or_Dec_velocity': [-72.]})
+    start_time = 59000.
+    ra_interp, dec_interp = ephemeris_tools.ephemeris_from_catalog(catalog, False, False, start_time, None, None)
+
+    start_stamp = ephemeris_tools.to_timestamp(ephemeris_tools.obstime_to_datetime(start_time))
+    assert np.isclose(ra_interp(start_stamp), 10.)
+    assert np.isclose(dec_interp(start_stamp), 20.)
+    assert np.isclose(ra_interp(start_stamp + 3600.), 10.01)
+    assert np.isclose(dec_interp(start_stamp + 3600.), 19.98)
@@ -12,6 +12,7 @@ import os
 
 import numpy as np
 import pytest
+import yaml
 
 from mirage.yaml.yaml_generator import SimInput
 
@@ -540,6 +541,145 @@ def test_reffile_crds_full_name():
     os.system('rm -r {}'.format(temp_output_dir))
 
 
+def create_yaml_files(output_dir):
+    """Run create_inputs on a small NIRCam imaging + NIRISS WFSS program,
+    with numpy's random number generator seeded so that the yaml files
+    can be compared between runs
+    """
+    input_xml = os.path.join(__location__, 'test_data/misc/12345/12345_nircam_imaging_prime_niriss_wfss_parallel.xml')
+    pointing_file = os.path.join(__location__, 'test_data/misc/12345/12345_nircam_imaging_prime_niriss_wfss_parallel.pointing')
+
+    yam = SimInput(input_xml, pointing_file, catalogs=None, offline=True, output_dir=output_dir,
+                   simdata_output_dir=output_dir, datatype='raw', reffile_defaults='crds')
+    yam.use_linearized_darks = True
+    np.random.seed(1234)
+    yam.create_inputs()
+    return yam
+
+
+def read_output_files(output_dir):
+    """Return the contents of all files in a directory, keyed by file name
+    """
+    contents = {}
+    for filename in sorted(os.listdir(output_dir)):
+        path = os.path.join(output_dir, filename)
+        if os.path.isfile(path):
+            with open(path) as fobj:
+                contents[filename] = fobj.read()
+    return contents
+
+
+def test_create_inputs_yaml_values(tmp_path):
+    """Check the grism flags, observation mode, sequence ID and dither
+    position numbers in the yaml files against values calculated one
+    exposure at a time from the observation table
+    """
+    yam = create_yaml_files(str(tmp_path))
+    info = yam.info
+    yaml_index = {name: i for i, name in enumerate(info['yamlfile'])}
+
+    assert len(yam.yaml_files) > 0
+    for filename in yam.yaml_files:
+        with open(filename) as fobj:
+            params = yaml.safe_load(fobj)
+        i = yaml_index[os.path.basename(filename)]
+
+        detector = info['detector'][i]
+        mode = info['Mode'][i]
+
+        # NIRCam SW detectors never use a grism mode
+        if info['Instrument'][i] == 'NIRCAM' and detector[-1] != '5':
+            assert mode not in ['wfss', 'ts_grism']
+        grism_source = mode.lower() in ['wfss', 'ts_grism'] and (detector == 'NIS' or detector[-1] == '5')
+        assert params['Inst']['mode'] == mode
+        assert params['Output']['grism_source_image'] == grism_source
+        assert info['grism_input_only'][i] == str(grism_source)
+
+        expected_sequence = '2' if info['CoordinatedParallel'][i].lower() == 'true' else '1'
+        assert params['Output']['sequence_id'] == expected_sequence
+
+        # Primary and subpixel dither numbers
+        total_dither = int(info['dither'][i])
+        subpix_positions = info['SubpixelPositions'][i]
+        if isinstance(subpix_positions, str) and subpix_positions.upper() == 'NONE':
+            subpix_total = 1
+        else:
+            try:
+                subpix_total = int(subpix_positions)
+            except (ValueError, TypeError):
+                subpix_total = int(subpix_positions[0])
+        assert params['Output']['primary_dither_position'] == int(np.ceil(total_dither / subpix_total))
+        assert params['Output']['subpix_dither_position'] == (total_dither - 1) % subpix_total + 1
+
+
+def test_create_inputs_observation_table(tmp_path):
+    """The observation table csv file should contain the same values as
+    a csv file written from the table by astropy
+    """
+    from astropy.io import ascii
+    from astropy.table import Table
+
+    yam = create_yaml_files(str(tmp_path))
+    table_file = os.path.join(str(tmp_path), 'Observation_table_for_12345_nircam_imaging_prime_niriss_wfss_parallel.xml'
+                                             '_with_yaml_parameters.csv')
+    comparison_file = os.path.join(str(tmp_path), 'comparison.csv')
+    Table(yam.info).write(comparison_file, format='csv', overwrite=True)
+
+    table = ascii.read(table_file, format='csv')
+    comparison = ascii.read(comparison_file, format='csv')
+    assert table.colnames == comparison.colnames
+    for colname in table.colnames:
+        assert [str(value) for value in table[colname]] == [str(value) for value in comparison[colname]]
+
+
+def test_create_inputs_thread_stability(tmp_path, monkeypatch):
+    """The complete output of create_inputs, including the random seeds in
+    the yaml files, should not depend on the number of threads used to
+    write the yaml files
+    """
+    from mirage.yaml import yaml_generator
+
+    # Both runs write to the same directory, so that the files can be
+    # compared exactly, including the paths they contain
+    output_dir = str(tmp_path)
+    threaded = create_yaml_files(output_dir)
+    threaded_contents = read_output_files(output_dir)
+
+    monkeypatch.setattr(yaml_generator, 'MAX_YAML_WRITE_THREADS', 1)
+    serial = create_yaml_files(output_dir)
+    serial_contents = read_output_files(output_dir)
+
+    # Output file lists are in exposure order
+    assert threaded.yaml_files == serial.yaml_files
+    assert len(threaded.yaml_files) > 0
+    assert threaded_contents == serial_contents
+
+    # Each file gets its own seeds
+    seeds = [yaml.safe_load(threaded_contents[os.path.basename(name)])['cosmicRay']['seed']
+             for name in threaded.yaml_files]
+    assert len(set(seeds)) == len(seeds)
+
+
+def test_all_obs_v3pa_on_date(monkeypatch):
+    """V3PA values calculated concurrently should be returned for the
+    matching observations
+    """
+    from mirage.yaml import yaml_generator
+
+    pointing_file = os.path.join(__location__, 'test_data/misc/12345/12345_nircam_imaging_prime_niriss_wfss_parallel.pointing')
+
+    # Return a value that identifies the observation rather than querying the ephemeris
+    def fake_v3pa(pointing_filename, obs_num, date=None, verbose=False, pointing_table=None):
+        return 10. * obs_num
+
+    monkeypatch.setattr(yaml_generator, 'default_obs_v3pa_on_date', fake_v3pa)
+    pas = yaml_generator.all_obs_v3pa_on_date(pointing_file, date='2022-10-01')
+
+    assert len(pas) > 0
+    for obs_num, pa in pas.items():
+        assert pa == 10. * int(obs_num)
+
+
 # Return environment variable to original value. This is helpful when
 # calling many tests at once, some of which need the real value.
 if not ON_GITHUB: